@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark de presupuesto del bundle del clasificador de intenciones para el navegador.
+
+Mide lo que descarga y ejecuta apps/patients (intent.onnx, tokenizer.json,
+vocab.txt, labels.json): bytes por artefacto, tiempo de carga en frío
+(import de onnxruntime + sesión + tokenizer en un proceso nuevo, con los
+artefactos fuera del page cache) y latencia p50/p95 por mensaje con el
+proveedor CPU de onnxruntime. Sale con código 1 si se supera algún
+presupuesto, para que un modelo base más pesado no llegue al bundle.
+
+Requisitos:
+  pip install onnxruntime tokenizers numpy
+
+Uso:
+  python scripts/ai/bench_intent_bundle.py --model-dir ./models/intent-onnx \
+    --input data/valid.csv --max-bundle-kb 10240 --max-p95-ms 50
+
+  # Presupuestos desde JSON: {"max_bundle_kb": 10240, "max_p95_ms": 50, ...}
+  python scripts/ai/bench_intent_bundle.py --model-dir ./models/intent-onnx --budget budget.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from intent_inference import IntentClassifier, read_texts
+
+BUNDLE_FILES = ('intent.onnx', 'tokenizer.json', 'vocab.txt', 'labels.json')
+
+# Ver apps/patients/public/models/README.md (peso recomendado < 5–10 MB)
+DEFAULT_BUDGET = {
+    'max_bundle_kb': 10 * 1024,
+    'max_model_kb': 10 * 1024,
+    'max_cold_load_ms': 1000.0,
+    'max_p50_ms': 20.0,
+    'max_p95_ms': 50.0,
+}
+
+SAMPLE_MESSAGES = [
+    'Hola, quiero sacar un turno con el médico para mañana',
+    'Tengo fiebre y dolor de cabeza desde ayer',
+    '¿Cuánto cuesta la consulta?',
+    'Necesito reprogramar mi cita del jueves',
+    'Gracias por la ayuda',
+]
+
+
+def artifact_sizes(model_dir):
+    sizes = {}
+    for name in BUNDLE_FILES:
+        path = Path(model_dir) / name
+        if path.exists():
+            sizes[name] = path.stat().st_size
+    return sizes
+
+
+# Carga medida en un proceso nuevo: en el mismo proceso onnxruntime ya está inicializado
+COLD_LOAD_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from intent_inference import IntentClassifier
+IntentClassifier(sys.argv[2], cache_size=0, batch_size=1, threads=int(sys.argv[3]))
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def evict_page_cache(model_dir):
+    """Pide al kernel sacar los artefactos del page cache (best effort, no requiere root)."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for name in BUNDLE_FILES:
+        path = Path(model_dir) / name
+        if path.exists():
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def cold_load_ms(model_dir, threads=1):
+    """Import + carga del clasificador en un intérprete nuevo, con los artefactos fuera de caché."""
+    evict_page_cache(model_dir)
+    out = subprocess.run(
+        [sys.executable, '-c', COLD_LOAD_SNIPPET, str(Path(__file__).resolve().parent), str(model_dir), str(threads)],
+        check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout.split()[-1])
+
+
+def measure(model_dir, texts, cold_runs=5, threads=1):
+    """Carga en frío (mediana de cold_runs procesos nuevos) y latencia por mensaje con lotes de 1."""
+    cold = [cold_load_ms(model_dir, threads) for _ in range(cold_runs)]
+
+    clf = IntentClassifier(model_dir, cache_size=0, batch_size=1, threads=threads)
+    clf.logits(texts[:1])  # warm-up
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        clf.logits([text])
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'cold_load_ms': float(np.median(cold)),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'messages': len(texts),
+    }
+
+
+def check_budget(sizes, timings, budget):
+    """Lista de presupuestos excedidos como (nombre, valor, límite)."""
+    values = {
+        'max_bundle_kb': sum(sizes.values()) / 1024,
+        'max_model_kb': sizes.get('intent.onnx', 0) / 1024,
+        'max_cold_load_ms': timings['cold_load_ms'],
+        'max_p50_ms': timings['p50_ms'],
+        'max_p95_ms': timings['p95_ms'],
+    }
+    return [(k, values[k], limit) for k, limit in budget.items()
+            if limit is not None and values[k] > limit]
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--model-dir', required=True, help='Carpeta --out de train_intent_classifier.py')
+    p.add_argument('--input', help='Mensajes de prueba: .txt, .csv, .json (lista) o .jsonl (columna text)')
+    p.add_argument('--limit', type=int, default=500, help='Máximo de mensajes para medir latencia')
+    p.add_argument('--cold-runs', type=int, default=5,
+                   help='Cargas en frío, cada una en un proceso nuevo (se usa la mediana)')
+    p.add_argument('--threads', type=int, default=1,
+                   help='Hilos intra-op (1 se aproxima al runtime wasm sin threads)')
+    p.add_argument('--budget', help='JSON con presupuestos; los flags --max-* lo sobrescriben')
+    for key, value in DEFAULT_BUDGET.items():
+        p.add_argument('--' + key.replace('_', '-'), type=float, default=None,
+                       help=f'Presupuesto (por defecto {value:g})')
+    p.add_argument('--json', help='Guardar el reporte en JSON')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    budget = dict(DEFAULT_BUDGET)
+    if args.budget:
+        with open(args.budget) as f:
+            budget.update(json.load(f))
+        unknown = sorted(set(budget) - set(DEFAULT_BUDGET))
+        if unknown:
+            print(f'❌ Presupuestos desconocidos en {args.budget}: {unknown} '
+                  f'(válidos: {sorted(DEFAULT_BUDGET)})')
+            return 2
+    for key in DEFAULT_BUDGET:
+        if getattr(args, key) is not None:
+            budget[key] = getattr(args, key)
+
+    texts = read_texts(args.input)[:args.limit] if args.input else SAMPLE_MESSAGES
+    sizes = artifact_sizes(args.model_dir)
+    if 'intent.onnx' not in sizes:
+        print(f'❌ No existe {Path(args.model_dir) / "intent.onnx"}')
+        return 1
+    timings = measure(args.model_dir, texts, cold_runs=args.cold_runs, threads=args.threads)
+
+    print('📦 Artefactos del bundle')
+    for name, size in sizes.items():
+        print(f'   {name:<15} {size / 1024:10.1f} KB')
+    print(f"   {'total':<15} {sum(sizes.values()) / 1024:10.1f} KB")
+    print(f"⏱️  Carga en frío: {timings['cold_load_ms']:.1f} ms")
+    print(f"⏱️  Latencia por mensaje: p50 {timings['p50_ms']:.2f} ms, "
+          f"p95 {timings['p95_ms']:.2f} ms ({timings['messages']} mensajes)")
+
+    exceeded = check_budget(sizes, timings, budget)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'bytes': sizes,
+                'timings': timings,
+                'budget': budget,
+                'exceeded': [{'budget': k, 'value': v, 'limit': l} for k, v, l in exceeded],
+            }, f, indent=2)
+
+    if exceeded:
+        for key, value, limit in exceeded:
+            print(f'❌ {key}: {value:.2f} > {limit:g}')
+        return 1
+    print('✅ Dentro del presupuesto')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
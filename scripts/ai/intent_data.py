@@ -0,0 +1,189 @@
+"""
+Utilidades de datos para train_intent_classifier.py.
+
+- Caché persistente de datasets tokenizados en Arrow (memory-mapped), indexada
+  por (hash del tokenizer, hash del archivo de datos): re-ejecutar el
+  entrenamiento con los mismos datos no vuelve a tokenizar.
+- Columna `length` para que el Trainer agrupe lotes por longitud
+  (group_by_length) y el padding dinámico desperdicie menos cómputo.
+- PaddingStats: reporte por época de tokens reales vs. tokens de padding.
+- Entrenamiento incremental: cada fila lleva `row_hash` (texto + etiqueta) y
+  seen-rows.npy guarda los hashes ya entrenados, de modo que una re-ejecución
+  sólo usa filas nuevas o modificadas más una muestra de repaso (replay).
+- Modo streaming para corpus de varios GB (uno o varios shards por glob): el
+  archivo se recorre de forma perezosa y el vocabulario de etiquetas se arma en
+  una sola pasada con memoria acotada.
+"""
+
+import glob
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from datasets import load_dataset, load_from_disk
+from transformers import TrainerCallback
+
+HASH_CHUNK = 1 << 20
+SCAN_BATCH = 10_000
+# Subir al cambiar las columnas que guarda la caché tokenizada
+CACHE_VERSION = 2
+
+
+def data_files(path):
+    """Expande un glob de shards (data/train-*.jsonl) a la lista ordenada de archivos."""
+    files = sorted(glob.glob(path))
+    if not files:
+        raise FileNotFoundError(f'No hay archivos que coincidan con {path}')
+    return files
+
+
+def load_data(path, streaming=False):
+    files = data_files(path)
+    ext = Path(files[0]).suffix.lower()
+    if ext == '.csv':
+        return load_dataset('csv', data_files=files, streaming=streaming)
+    return load_dataset('json', data_files=files, streaming=streaming)
+
+
+def file_hash(path):
+    """sha256 de los archivos (o shards) leídos en bloques, sin cargarlos enteros en memoria."""
+    h = hashlib.sha256()
+    for name in data_files(path):
+        with open(name, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def tokenizer_hash(tokenizer):
+    """Hash del tokenizer serializado + longitud máxima de truncado."""
+    h = hashlib.sha256()
+    h.update(tokenizer.backend_tokenizer.to_str().encode('utf-8'))
+    h.update(str(tokenizer.model_max_length).encode('utf-8'))
+    return h.hexdigest()
+
+
+def tokenized_dataset(path, tokenizer, cache_dir=None):
+    """
+    Devuelve el dataset tokenizado (input_ids, attention_mask, ..., length, row_hash, label).
+
+    Si hay cache_dir y existe una entrada para (tokenizer, archivo) se carga con
+    load_from_disk, que mapea el Arrow en memoria sin copiarlo.
+    """
+    target = None
+    if cache_dir:
+        key = f'{CACHE_VERSION}:{tokenizer_hash(tokenizer)}:{file_hash(path)}'
+        key = hashlib.sha256(key.encode()).hexdigest()[:24]
+        target = Path(cache_dir) / key
+        if (target / 'dataset_info.json').exists():
+            print(f'♻️  Dataset tokenizado desde caché: {target}')
+            return load_from_disk(str(target))
+
+    ds = load_data(path)['train']
+
+    def tokenize(batch):
+        enc = tokenizer(batch['text'], truncation=True)
+        enc['length'] = [len(ids) for ids in enc['input_ids']]
+        enc['row_hash'] = [row_hash(t, l) for t, l in zip(batch['text'], batch['label'])]
+        return enc
+
+    ds = ds.map(tokenize, batched=True, remove_columns=[c for c in ds.column_names if c != 'label'])
+
+    if target:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        ds.save_to_disk(str(target))
+        # Recargar desde disco para trabajar sobre el Arrow mapeado
+        ds = load_from_disk(str(target))
+    return ds
+
+
+def encode_labels(ds, label2id):
+    """Reemplaza la columna de texto `label` por `labels` (ids enteros)."""
+    return ds.map(
+        lambda batch: {'labels': [label2id[l] for l in batch['label']]},
+        batched=True,
+        remove_columns=['label'],
+    )
+
+
+def row_hash(text, label):
+    """Hash estable de 64 bits de (texto, etiqueta): un cambio de etiqueta cuenta como fila nueva."""
+    digest = hashlib.blake2b(f'{label}\x00{text}'.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def load_seen(path):
+    path = Path(path)
+    return np.load(path) if path.exists() else np.empty(0, dtype=np.int64)
+
+
+def save_seen(path, seen, ds):
+    """Une los hashes ya vistos con los del dataset actual (array ordenado, sin duplicados)."""
+    np.save(path, np.union1d(seen, np.asarray(ds['row_hash'], dtype=np.int64)))
+
+
+def select_incremental(ds, seen, replay_ratio=0.5, seed=42):
+    """Filas no vistas + una muestra aleatoria de filas vistas (replay_ratio × nuevas)."""
+    is_new = ~np.isin(np.asarray(ds['row_hash'], dtype=np.int64), seen)
+    new_idx = np.flatnonzero(is_new)
+    old_idx = np.flatnonzero(~is_new)
+    n_replay = min(len(old_idx), int(round(len(new_idx) * replay_ratio)))
+    replay_idx = np.random.default_rng(seed).choice(old_idx, size=n_replay, replace=False)
+    print(f'🔁 Incremental: {len(new_idx)} filas nuevas/modificadas + {n_replay} de repaso '
+          f'(de {len(ds)})')
+    return ds.select(np.sort(np.concatenate([new_idx, replay_idx])))
+
+
+def scan_labels(path):
+    """Cuenta filas por etiqueta en una sola pasada en streaming (memoria ∝ nº de etiquetas)."""
+    counts = Counter()
+    stream = load_data(path, streaming=True)['train'].select_columns(['label'])
+    for batch in stream.iter(batch_size=SCAN_BATCH):
+        counts.update(batch['label'])
+    return counts
+
+
+def streaming_dataset(path, tokenizer, label2id, shuffle_buffer=10_000, seed=42):
+    """IterableDataset tokenizado de forma perezosa, barajado con un buffer acotado."""
+    stream = load_data(path, streaming=True)['train'].select_columns(['text', 'label'])
+
+    def tokenize(batch):
+        enc = tokenizer(batch['text'], truncation=True)
+        enc['labels'] = [label2id[l] for l in batch['label']]
+        return enc
+
+    stream = stream.shuffle(seed=seed, buffer_size=shuffle_buffer)
+    return stream.map(tokenize, batched=True, remove_columns=['text', 'label'])
+
+
+class PaddingStats(TrainerCallback):
+    """Cuenta tokens reales vs. padding por época a partir de la attention_mask de cada lote."""
+
+    def __init__(self, report_path=None):
+        self.report_path = Path(report_path) if report_path else None
+        self.epochs = []
+        self._real = 0
+        self._total = 0
+
+    def update(self, attention_mask):
+        self._real += int(attention_mask.sum())
+        self._total += int(attention_mask.numel())
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        padded = self._total - self._real
+        entry = {
+            'epoch': round(state.epoch or len(self.epochs) + 1, 2),
+            'tokens': self._real,
+            'padded_tokens': padded,
+            'padding_ratio': round(padded / self._total, 4) if self._total else 0.0,
+        }
+        self.epochs.append(entry)
+        self._real = self._total = 0
+        if state.is_world_process_zero:
+            print(f"📏 Época {entry['epoch']}: {entry['tokens']} tokens, "
+                  f"{entry['padded_tokens']} de padding ({entry['padding_ratio']:.1%})")
+            if self.report_path:
+                with open(self.report_path, 'w') as f:
+                    json.dump(self.epochs, f, indent=2)
@@ -0,0 +1,95 @@
+"""
+Destilación de conocimiento para train_intent_classifier.py.
+
+Un modelo teacher ya entrenado (p. ej. <out>/hf de un bert-small) enseña a un
+student BERT más chico (menos capas / hidden) a partir de sus logits. El student
+conserva el tokenizer del teacher, así que exporta con el mismo contrato
+intent.onnx + labels.json + vocab.txt que consume apps/patients.
+"""
+
+import json
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader
+from transformers import AutoConfig, AutoModelForSequenceClassification
+
+MODEL_COLUMNS = ('input_ids', 'attention_mask', 'token_type_ids', 'labels')
+
+
+def teacher_labels(teacher):
+    """Etiquetas en el orden de los logits del teacher."""
+    return [teacher.config.id2label[i] for i in range(teacher.config.num_labels)]
+
+
+def build_student(teacher_dir, layers, hidden=None):
+    """
+    Student con `layers` capas. Si conserva el hidden del teacher se inicializa
+    con sus primeras capas (estilo DistilBERT); si no, desde cero.
+    """
+    config = AutoConfig.from_pretrained(teacher_dir)
+    if hidden is None or hidden == config.hidden_size:
+        return AutoModelForSequenceClassification.from_pretrained(teacher_dir, num_hidden_layers=layers)
+    config.num_hidden_layers = layers
+    config.hidden_size = hidden
+    config.num_attention_heads = max(1, hidden // 64)
+    config.intermediate_size = hidden * 4
+    return AutoModelForSequenceClassification.from_config(config)
+
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature=2.0, alpha=0.5):
+    """alpha * CE(etiquetas) + (1 - alpha) * T² * KL(teacher || student) sobre logits suavizados."""
+    hard = F.cross_entropy(student_logits, labels)
+    soft = F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=-1),
+        F.softmax(teacher_logits / temperature, dim=-1),
+        reduction='batchmean',
+    ) * temperature ** 2
+    return alpha * hard + (1 - alpha) * soft
+
+
+@torch.inference_mode()
+def _evaluate(model, ds, collator, latency_samples=200):
+    model.eval()
+    # El Trainer deja teacher y student en su dispositivo (GPU si hay): los lotes van ahí
+    device = next(model.parameters()).device
+    preds, ys, timings = [], [], []
+    for batch in DataLoader(ds, batch_size=64, collate_fn=collator):
+        ys.append(batch.pop('labels').numpy())
+        batch = {k: v.to(device) for k, v in batch.items()}
+        preds.append(model(**batch).logits.argmax(dim=-1).cpu().numpy())
+    # Latencia por mensaje: lotes de 1 como en el navegador
+    for row in ds.select(range(min(latency_samples, len(ds)))):
+        inputs = {k: torch.tensor([v], device=device) for k, v in row.items() if k != 'labels'}
+        start = time.perf_counter()
+        model(**inputs)
+        if device.type == 'cuda':
+            torch.cuda.synchronize(device)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'acc': round(float((np.concatenate(preds) == np.concatenate(ys)).mean()), 4),
+        'params': sum(p.numel() for p in model.parameters()),
+        'latency_ms_p50': round(float(np.percentile(timings, 50)), 3),
+        'latency_ms_p95': round(float(np.percentile(timings, 95)), 3),
+    }
+
+
+def distill_report(teacher, student, ds_valid, collator, path):
+    """Compara exactitud, parámetros y latencia (PyTorch, en el dispositivo de cada modelo) de teacher vs. student."""
+    ds = ds_valid.select_columns([c for c in ds_valid.column_names if c in MODEL_COLUMNS])
+    report = {
+        'teacher': _evaluate(teacher, ds, collator),
+        'student': _evaluate(student, ds, collator),
+    }
+    report['speedup_p50'] = round(report['teacher']['latency_ms_p50'] / report['student']['latency_ms_p50'], 2)
+    report['acc_delta'] = round(report['student']['acc'] - report['teacher']['acc'], 4)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name in ('teacher', 'student'):
+        r = report[name]
+        print(f"   {name:>7}: acc={r['acc']:.4f} params={r['params']:,} "
+              f"p50={r['latency_ms_p50']:.2f}ms p95={r['latency_ms_p95']:.2f}ms")
+    print(f"   speedup x{report['speedup_p50']}, Δacc {report['acc_delta']:+.4f}")
+    return report
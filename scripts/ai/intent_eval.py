@@ -0,0 +1,132 @@
+"""
+Evaluación vectorizada y calibración del clasificador de intenciones.
+
+Todo opera sobre arrays de NumPy completos (sin bucles de Python por muestra),
+así que un set de validación de 100k filas se evalúa en segundos:
+  - exactitud, F1 macro, precisión/recall por etiqueta y matriz de confusión
+  - exactitud top-k
+  - expected calibration error (ECE), antes y después de temperature scaling
+  - ajuste de la temperatura T que minimiza la NLL sobre validación
+  - deriva de logits ONNX vs. PyTorch (para detectar daño por quantización)
+"""
+
+import numpy as np
+
+ECE_BINS = 15
+TOP_K = (1, 3)
+
+
+def log_softmax(logits, temperature=1.0):
+    z = logits / temperature
+    z = z - z.max(axis=-1, keepdims=True)
+    return z - np.log(np.exp(z).sum(axis=-1, keepdims=True))
+
+
+def confusion_matrix(y, pred, n_labels):
+    """cm[i, j] = filas con etiqueta real i y predicha j."""
+    return np.bincount(y * n_labels + pred, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+
+
+def per_label_scores(cm):
+    tp = np.diag(cm).astype(float)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+    return precision, recall, f1, support
+
+
+def macro_f1(cm):
+    """F1 macro sobre las etiquetas presentes en y o en las predicciones (como sklearn)."""
+    _, _, f1, support = per_label_scores(cm)
+    present = (support + cm.sum(axis=0)) > 0
+    return float(f1[present].mean()) if present.any() else 0.0
+
+
+def top_k_accuracy(logits, y, k):
+    k = min(k, logits.shape[-1])
+    top = np.argpartition(-logits, k - 1, axis=-1)[:, :k]
+    return float((top == y[:, None]).any(axis=-1).mean())
+
+
+def expected_calibration_error(probs, y, bins=ECE_BINS):
+    """ECE con bins de confianza equiespaciados: Σ |acc_bin − conf_bin| · n_bin / N."""
+    conf = probs.max(axis=-1)
+    correct = (probs.argmax(axis=-1) == y).astype(float)
+    idx = np.minimum((conf * bins).astype(int), bins - 1)
+    conf_sum = np.bincount(idx, weights=conf, minlength=bins)
+    correct_sum = np.bincount(idx, weights=correct, minlength=bins)
+    return float(np.abs(correct_sum - conf_sum).sum() / max(len(y), 1))
+
+
+def nll(logits, y, temperature=1.0):
+    return float(-log_softmax(logits, temperature)[np.arange(len(y)), y].mean())
+
+
+def fit_temperature(logits, y, lo=0.05, hi=20.0, iters=40):
+    """Temperatura que minimiza la NLL (búsqueda de sección áurea sobre log T)."""
+    a, b = np.log(lo), np.log(hi)
+    ratio = (np.sqrt(5) - 1) / 2
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    fc, fd = nll(logits, y, np.exp(c)), nll(logits, y, np.exp(d))
+    for _ in range(iters):
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = nll(logits, y, np.exp(c))
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = nll(logits, y, np.exp(d))
+    return float(np.exp((a + b) / 2))
+
+
+def basic_metrics(logits, y):
+    """Métricas livianas para compute_metrics en cada época."""
+    n_labels = logits.shape[-1]
+    cm = confusion_matrix(y, logits.argmax(axis=-1), n_labels)
+    return {
+        'acc': float(np.trace(cm) / max(len(y), 1)),
+        'f1': macro_f1(cm),
+        f'top{TOP_K[-1]}': top_k_accuracy(logits, y, TOP_K[-1]),
+        'ece': expected_calibration_error(np.exp(log_softmax(logits)), y),
+    }
+
+
+def logits_drift(reference, other):
+    """Diferencia entre logits de PyTorch y ONNX sobre las mismas filas."""
+    diff = np.abs(reference - other)
+    return {
+        'max_abs': float(diff.max()),
+        'mean_abs': float(diff.mean()),
+        'argmax_agreement': float((reference.argmax(axis=-1) == other.argmax(axis=-1)).mean()),
+    }
+
+
+def evaluation_report(logits, y, labels):
+    """Reporte completo: métricas, confusión, top-k, calibración y temperatura ajustada."""
+    logits = np.asarray(logits, dtype=np.float64)
+    y = np.asarray(y)
+    cm = confusion_matrix(y, logits.argmax(axis=-1), len(labels))
+    precision, recall, f1, support = per_label_scores(cm)
+    temperature = fit_temperature(logits, y)
+    return {
+        'rows': int(len(y)),
+        'acc': float(np.trace(cm) / max(len(y), 1)),
+        'f1_macro': macro_f1(cm),
+        'top_k': {str(k): top_k_accuracy(logits, y, k) for k in TOP_K},
+        'calibration': {
+            'temperature': temperature,
+            'nll': nll(logits, y),
+            'nll_calibrated': nll(logits, y, temperature),
+            'ece': expected_calibration_error(np.exp(log_softmax(logits)), y),
+            'ece_calibrated': expected_calibration_error(np.exp(log_softmax(logits, temperature)), y),
+        },
+        'per_label': {
+            label: {'precision': float(p), 'recall': float(r), 'f1': float(f), 'support': int(s)}
+            for label, p, r, f, s in zip(labels, precision, recall, f1, support)
+        },
+        'confusion_matrix': {'labels': list(labels), 'matrix': cm.tolist()},
+    }
@@ -0,0 +1,177 @@
+"""
+Exportación a ONNX y quantización en proceso para train_intent_classifier.py.
+
+Reemplaza las llamadas a `optimum-cli` vía os.system: cada etapa usa la API de
+optimum/onnxruntime, falla con un error explícito si no produce el modelo y
+deja constancia en export-manifest.json de tamaño, latencia y exactitud de cada
+variante sobre el set de validación.
+
+Variantes disponibles:
+  - dynamic-int8: pesos INT8, activaciones quantizadas en tiempo de ejecución
+  - static-int8:  INT8 con rangos de activación calibrados sobre datos de train
+  - o2 / o3:      grafo optimizado por onnxruntime (fusiones; O3 + GELU aprox.)
+  - fp16:         pesos en FP16 (entradas/salidas siguen en FP32)
+
+El modelo desplegado como intent.onnx es el más rápido cuya pérdida de
+exactitud respecto al export FP32 no supera --acc-budget.
+"""
+
+import json
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from intent_inference import IntentClassifier
+
+VARIANTS = ('dynamic-int8', 'static-int8', 'o2', 'o3', 'fp16')
+MODEL_INPUTS = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+def export_onnx(hf_dir, onnx_dir):
+    from optimum.exporters.onnx import main_export
+
+    main_export(str(hf_dir), output=str(onnx_dir), task='text-classification')
+    model_path = Path(onnx_dir) / 'model.onnx'
+    if not model_path.exists():
+        raise RuntimeError(f'La exportación a ONNX no generó {model_path}')
+    return model_path
+
+
+def quantize(onnx_dir, save_dir, isa='avx2', calibration_ds=None):
+    """INT8 dinámico, o estático si se pasa un dataset de calibración."""
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoCalibrationConfig, AutoQuantizationConfig
+
+    is_static = calibration_ds is not None
+    quantizer = ORTQuantizer.from_pretrained(str(onnx_dir), file_name='model.onnx')
+    qconfig = getattr(AutoQuantizationConfig, isa)(is_static=is_static, per_channel=False)
+    ranges = None
+    if is_static:
+        calibration_config = AutoCalibrationConfig.minmax(calibration_ds)
+        ranges = quantizer.fit(
+            dataset=calibration_ds,
+            calibration_config=calibration_config,
+            operators_to_quantize=qconfig.operators_to_quantize,
+        )
+    quantizer.quantize(save_dir=str(save_dir), quantization_config=qconfig,
+                       calibration_tensors_range=ranges)
+    return Path(save_dir) / 'model_quantized.onnx'
+
+
+def optimize_graph(onnx_dir, save_dir, level):
+    from optimum.onnxruntime import ORTOptimizer
+    from optimum.onnxruntime.configuration import AutoOptimizationConfig
+
+    optimizer = ORTOptimizer.from_pretrained(str(onnx_dir), file_names=['model.onnx'])
+    optimizer.optimize(save_dir=str(save_dir), optimization_config=getattr(AutoOptimizationConfig, level)())
+    return Path(save_dir) / 'model_optimized.onnx'
+
+
+def convert_fp16(onnx_path, save_dir):
+    import onnx
+    from onnxruntime.transformers.float16 import convert_float_to_float16
+
+    save_dir = Path(save_dir)
+    save_dir.mkdir(parents=True, exist_ok=True)
+    model = convert_float_to_float16(onnx.load(str(onnx_path)), keep_io_types=True)
+    target = save_dir / 'model.onnx'
+    onnx.save(model, str(target))
+    return target
+
+
+def model_bytes(model_path):
+    """Tamaño del modelo incluyendo archivos de datos externos, si los hay."""
+    model_path = Path(model_path)
+    extra = model_path.parent.glob(model_path.name + '*data')
+    return model_path.stat().st_size + sum(p.stat().st_size for p in extra)
+
+
+def evaluate_variant(out, model_path, texts, y, max_length=128, latency_samples=200):
+    """
+    Exactitud sobre validación y latencia por mensaje (lote de 1) con onnxruntime CPU.
+
+    max_length debe coincidir con el truncado de entrenamiento para que la exactitud sea comparable.
+    """
+    clf = IntentClassifier(out, model_path=model_path, cache_size=0, max_length=max_length)
+    label2id = {l: i for i, l in enumerate(clf.labels)}
+    preds = np.concatenate([
+        clf.logits(texts[i:i + 64]).argmax(axis=-1) for i in range(0, len(texts), 64)
+    ])
+    acc = float((preds == np.array([label2id[l] for l in y])).mean())
+
+    timings = []
+    for text in texts[:latency_samples]:
+        start = time.perf_counter()
+        clf.logits([text])
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'acc': round(acc, 4),
+        'latency_ms_p50': round(float(np.percentile(timings, 50)), 3),
+        'latency_ms_p95': round(float(np.percentile(timings, 95)), 3),
+        'bytes': model_bytes(model_path),
+    }
+
+
+def calibration_dataset(ds, rows=256):
+    """Subconjunto del dataset tokenizado con sólo las columnas de entrada del modelo."""
+    ds = ds.select(range(min(rows, len(ds))))
+    return ds.remove_columns([c for c in ds.column_names if c not in MODEL_INPUTS])
+
+
+def run_export(out, hf_dir, texts, y, variants=('dynamic-int8',), acc_budget=0.01,
+               calibration_ds=None, isa='avx2', max_length=128):
+    """
+    Exporta FP32, genera las variantes pedidas, las valida y copia la elegida a intent.onnx.
+
+    Devuelve el manifest (también escrito en <out>/export-manifest.json).
+    """
+    out = Path(out)
+    onnx_dir = out / 'onnx'
+    fp32_path = export_onnx(hf_dir, onnx_dir)
+    builders = {
+        'dynamic-int8': lambda: quantize(onnx_dir, out / 'onnx-quant', isa),
+        'static-int8': lambda: quantize(onnx_dir, out / 'onnx-static', isa, calibration_ds),
+        'o2': lambda: optimize_graph(onnx_dir, out / 'onnx-o2', 'O2'),
+        'o3': lambda: optimize_graph(onnx_dir, out / 'onnx-o3', 'O3'),
+        'fp16': lambda: convert_fp16(fp32_path, out / 'onnx-fp16'),
+    }
+
+    baseline = {'name': 'fp32', 'path': str(fp32_path.relative_to(out)),
+                **evaluate_variant(out, fp32_path, texts, y, max_length)}
+    baseline['acc_delta'] = 0.0
+    entries = [baseline]
+    for name in variants:
+        if name == 'static-int8' and calibration_ds is None:
+            entries.append({'name': name, 'error': 'sin dataset de calibración'})
+            continue
+        try:
+            path = builders[name]()
+            entry = {'name': name, 'path': str(path.relative_to(out)), **evaluate_variant(out, path, texts, y, max_length)}
+            entry['acc_delta'] = round(entry['acc'] - baseline['acc'], 4)
+        except Exception as e:
+            print(f'⚠️  Variante {name} falló: {e}')
+            entry = {'name': name, 'error': str(e)}
+        entries.append(entry)
+
+    for e in entries:
+        if 'error' not in e:
+            print(f"   {e['name']:>12}: acc={e['acc']:.4f} ({e['acc_delta']:+.4f}) "
+                  f"p50={e['latency_ms_p50']:.2f}ms {e['bytes'] / 1e6:.2f}MB")
+
+    # El más rápido dentro del presupuesto de exactitud (fp32 siempre califica)
+    eligible = [e for e in entries if 'error' not in e and -e['acc_delta'] <= acc_budget]
+    selected = min(eligible, key=lambda e: e['latency_ms_p50'])
+    shutil.copyfile(out / selected['path'], out / 'intent.onnx')
+    print(f"🚀 intent.onnx ← {selected['name']} ({selected['path']})")
+
+    manifest = {
+        'acc_budget': acc_budget,
+        'valid_rows': len(texts),
+        'selected': selected['name'],
+        'variants': entries,
+    }
+    with open(out / 'export-manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Inferencia por lotes del clasificador de intenciones exportado por
+train_intent_classifier.py (intent.onnx + labels.json + tokenizer.json).
+
+Carga el modelo una sola vez en una sesión de onnxruntime, tokeniza con el
+tokenizer.json guardado, agrupa los mensajes en micro-lotes con padding
+dinámico (cada lote se rellena sólo hasta su mensaje más largo) y mantiene una
+caché LRU de resultados recientes `texto -> etiqueta/probabilidades`.
+
+Requisitos:
+  pip install onnxruntime tokenizers numpy
+
+Uso:
+  # Clasificar mensajes (txt con un mensaje por línea, o CSV/JSONL con columna text)
+  python scripts/ai/intent_inference.py --model-dir ./models/intent-onnx \
+    --input data/mensajes.csv --output predicciones.jsonl
+
+  # Benchmark de throughput: intent.onnx (quantizado) vs onnx/model.onnx
+  python scripts/ai/intent_inference.py --model-dir ./models/intent-onnx \
+    --bench --input data/valid.csv
+"""
+
+import argparse
+import csv
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import onnxruntime as ort
+from tokenizers import Tokenizer
+
+BENCH_BATCH_SIZES = (1, 8, 32, 128)
+
+
+class IntentClassifier:
+    """Clasificador ONNX con micro-lotes, padding dinámico y caché LRU."""
+
+    def __init__(self, model_dir, model_path=None, max_length=128, batch_size=32,
+                 cache_size=4096, threads=None):
+        model_dir = Path(model_dir)
+        self.model_path = Path(model_path) if model_path else model_dir / 'intent.onnx'
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+        with open(model_dir / 'labels.json') as f:
+            self.labels = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / 'tokenizer.json'))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length=max_length)
+        pad_id = self.tokenizer.token_to_id('[PAD]')
+        self.pad_id = pad_id if pad_id is not None else 0
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(self.model_path), sess_options=opts, providers=['CPUExecutionProvider'],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts):
+        """Tokeniza y rellena hasta el mensaje más largo del lote."""
+        encodings = self.tokenizer.encode_batch(list(texts))
+        width = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(encodings), width), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+        token_type_ids = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, enc in enumerate(encodings):
+            n = len(enc.ids)
+            input_ids[row, :n] = enc.ids
+            attention_mask[row, :n] = 1
+            token_type_ids[row, :n] = enc.type_ids
+        feeds = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'token_type_ids': token_type_ids,
+        }
+        # Algunos modelos no usan token_type_ids
+        return {k: v for k, v in feeds.items() if k in self.input_names}
+
+    def logits(self, texts):
+        """Logits crudos de un micro-lote (sin caché)."""
+        return self.session.run(None, self.encode(texts))[0]
+
+    def predict(self, texts):
+        """Clasifica una lista de mensajes; devuelve [{'label', 'score', 'probs'}]."""
+        texts = list(texts)
+        results = [None] * len(texts)
+        pending = OrderedDict()
+        for i, text in enumerate(texts):
+            cached = self._cache_get(text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        # Ordenar por longitud reduce el padding de cada micro-lote
+        misses = sorted(pending, key=len)
+        for start in range(0, len(misses), self.batch_size):
+            chunk = misses[start:start + self.batch_size]
+            probs = softmax(self.logits(chunk))
+            for text, row in zip(chunk, probs):
+                best = int(row.argmax())
+                result = {
+                    'label': self.labels[best],
+                    'score': float(row[best]),
+                    'probs': {label: float(p) for label, p in zip(self.labels, row)},
+                }
+                self._cache_put(text, result)
+                for i in pending[text]:
+                    results[i] = result
+        return results
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache),
+                'max_size': self.cache_size}
+
+    def _cache_get(self, text):
+        result = self._cache.get(text)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._cache.move_to_end(text)
+        return result
+
+    def _cache_put(self, text, result):
+        if self.cache_size <= 0:
+            return
+        self._cache[text] = result
+        self._cache.move_to_end(text)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def softmax(logits):
+    z = logits - logits.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def read_texts(path):
+    """Lee mensajes desde .txt (uno por línea), .csv o .jsonl con columna text, o un array .json."""
+    path = Path(path)
+    ext = path.suffix.lower()
+    with open(path, encoding='utf-8') as f:
+        if ext == '.csv':
+            return [row['text'] for row in csv.DictReader(f)]
+        if ext == '.json':
+            # Array JSON de strings o de objetos {"text": ...}
+            return [row if isinstance(row, str) else row['text'] for row in json.load(f)]
+        if ext == '.jsonl':
+            return [json.loads(line)['text'] for line in f if line.strip()]
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def benchmark(model_dir, texts, batch_sizes=BENCH_BATCH_SIZES, threads=None):
+    """Mide textos/seg por tamaño de lote para el modelo quantizado y el onnx/ sin quantizar."""
+    model_dir = Path(model_dir)
+    variants = {
+        'quantized': model_dir / 'intent.onnx',
+        'fp32': model_dir / 'onnx' / 'model.onnx',
+    }
+    results = {}
+    for name, model_path in variants.items():
+        if not model_path.exists():
+            print(f'⚠️  {name}: no existe {model_path}, se omite')
+            continue
+        results[name] = {}
+        for batch_size in batch_sizes:
+            # Sin caché: medimos el modelo, no los aciertos de la LRU
+            clf = IntentClassifier(model_dir, model_path=model_path, batch_size=batch_size,
+                                   cache_size=0, threads=threads)
+            clf.predict(texts[:batch_size])  # warm-up
+            start = time.perf_counter()
+            clf.predict(texts)
+            elapsed = time.perf_counter() - start
+            results[name][batch_size] = len(texts) / elapsed
+            print(f'{name:>9} batch={batch_size:<4} {results[name][batch_size]:10.1f} textos/seg')
+    return results
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument('--model-dir', required=True, help='Carpeta --out de train_intent_classifier.py')
+    p.add_argument('--input', required=True, help='Mensajes: .txt, .csv, .json (lista) o .jsonl (columna text)')
+    p.add_argument('--output', help='JSONL de salida (por defecto stdout)')
+    p.add_argument('--batch', type=int, default=32, help='Tamaño de micro-lote')
+    p.add_argument('--max-length', type=int, default=128)
+    p.add_argument('--cache-size', type=int, default=4096, help='Entradas de la caché LRU (0 = sin caché)')
+    p.add_argument('--threads', type=int, default=None, help='Hilos intra-op de onnxruntime')
+    p.add_argument('--bench', action='store_true', help='Benchmark de throughput en lotes 1/8/32/128')
+    p.add_argument('--bench-json', help='Guardar resultados del benchmark en JSON')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    texts = read_texts(args.input)
+
+    if args.bench:
+        results = benchmark(args.model_dir, texts, threads=args.threads)
+        if args.bench_json:
+            with open(args.bench_json, 'w') as f:
+                json.dump({'texts': len(texts), 'texts_per_sec': results}, f, indent=2)
+        return
+
+    clf = IntentClassifier(args.model_dir, max_length=args.max_length, batch_size=args.batch,
+                           cache_size=args.cache_size, threads=args.threads)
+    start = time.perf_counter()
+    predictions = clf.predict(texts)
+    elapsed = time.perf_counter() - start
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for text, pred in zip(texts, predictions):
+            line = json.dumps({'text': text, **pred}, ensure_ascii=False)
+            if out:
+                out.write(line + '\n')
+            else:
+                print(line)
+    finally:
+        if out:
+            out.close()
+
+    if out:
+        print(f'✅ {len(texts)} mensajes en {elapsed:.2f}s → {args.output}')
+        print(f'   caché: {clf.cache_info()}')
+
+
+if __name__ == '__main__':
+    main()
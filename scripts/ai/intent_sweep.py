@@ -0,0 +1,139 @@
+"""
+Barrido de hiperparámetros para train_intent_classifier.py.
+
+Cada combinación de la grilla (--sweep spec.json) es un trial que entrena en un
+proceso propio de un pool dimensionado según los núcleos disponibles; los
+hilos de torch se reparten entre trials. Los datasets tokenizados se
+precalientan una vez en la caché (Arrow memory-mapped) y todos los trials la
+comparten. Tras la primera evaluación, un trial cuyo F1 queda por debajo de la
+mediana de los trials ya evaluados se poda (regla de la mediana, un escalón
+estilo ASHA). El resultado es sweep-leaderboard.json con la configuración
+elegida.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from transformers import AutoTokenizer, TrainerCallback
+
+from intent_data import tokenized_dataset
+
+
+class MedianPruner(TrainerCallback):
+    """Detiene el trial si su primera evaluación queda bajo la mediana de los demás."""
+
+    def __init__(self, trial_id, scores, min_trials=3, metric='eval_f1'):
+        self.trial_id = trial_id
+        self.scores = scores
+        self.min_trials = min_trials
+        self.metric = metric
+        self.checked = False
+        self.pruned = False
+
+    def on_evaluate(self, args, state, control, metrics=None, **kwargs):
+        if self.checked or not metrics or self.metric not in metrics:
+            return
+        self.checked = True
+        score = metrics[self.metric]
+        others = [v for k, v in self.scores.items() if k != self.trial_id]
+        self.scores[self.trial_id] = score
+        if len(others) >= self.min_trials and score < float(np.median(others)):
+            print(f'✂️  Trial {self.trial_id} podado: {self.metric}={score:.4f} < mediana {np.median(others):.4f}')
+            self.pruned = True
+            control.should_training_stop = True
+
+
+def grid(spec, samples=None, seed=42):
+    """Combinaciones de la grilla {param: [valores]}; opcionalmente una muestra al azar."""
+    keys = sorted(spec)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(spec[k] for k in keys))]
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+
+def _run_trial(trial_id, base_args, params, out, scores, threads, min_trials):
+    # Import diferido: el script principal importa este módulo
+    import train_intent_classifier
+
+    args = argparse.Namespace(**{
+        **vars(base_args),
+        **params,
+        'out': str(out),
+        'threads': threads,
+        'sweep': None,
+    })
+    pruner = MedianPruner(trial_id, scores, min_trials)
+    start = time.perf_counter()
+    metrics = train_intent_classifier.train(args, callbacks=[pruner], export=False) or {}
+    return {
+        'trial': trial_id,
+        'params': params,
+        'best_f1': metrics.get('best_f1'),
+        'epochs': metrics.get('epochs'),
+        'pruned': pruner.pruned,
+        'wall_seconds': round(time.perf_counter() - start, 2),
+        'out': str(out),
+    }
+
+
+def run_sweep(args):
+    with open(args.sweep) as f:
+        spec = json.load(f)
+    unknown = set(spec) - set(vars(args))
+    if unknown:
+        raise ValueError(f'Parámetros desconocidos en {args.sweep}: {sorted(unknown)}')
+    trials = grid(spec, args.sweep_samples)
+
+    out = Path(args.out)
+    sweep_dir = out / 'sweep'
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+
+    # Precalentar la caché para que los trials sólo mapeen el Arrow ya tokenizado
+    args.cache_dir = args.cache_dir or str(out / 'cache')
+    tokenizer = AutoTokenizer.from_pretrained(args.base)
+    tokenized_dataset(args.train, tokenizer, args.cache_dir)
+    tokenized_dataset(args.valid, tokenizer, args.cache_dir)
+
+    cores = os.cpu_count() or 1
+    jobs = args.sweep_jobs or max(1, min(len(trials), cores // 2))
+    threads = args.threads or max(1, cores // jobs)
+    print(f'🔬 Sweep: {len(trials)} trials, {jobs} en paralelo, {threads} hilos c/u')
+
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    with ctx.Manager() as manager:
+        scores = manager.dict()
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_run_trial, i, args, params, sweep_dir / f'trial-{i:03d}',
+                            scores, threads, args.prune_min_trials)
+                for i, params in enumerate(trials)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                status = 'podado' if result['pruned'] else 'completo'
+                print(f"   trial {result['trial']:03d} {status}: f1={result['best_f1']} {result['params']}")
+
+    finished = [r for r in results if r['best_f1'] is not None]
+    leaderboard = sorted(finished, key=lambda r: (r['pruned'], -r['best_f1']))
+    chosen = leaderboard[0] if leaderboard else None
+    with open(out / 'sweep-leaderboard.json', 'w') as f:
+        json.dump({
+            'spec': spec,
+            'chosen': chosen,
+            'leaderboard': leaderboard,
+        }, f, indent=2)
+    if chosen:
+        print(f"🏆 Mejor config: {chosen['params']} (f1={chosen['best_f1']:.4f}) → "
+              f"{out / 'sweep-leaderboard.json'}")
+    return 0
@@ -12,96 +12,330 @@ Uso:
     --out ./models/intent-onnx --base prajjwal1/bert-tiny \
     --epochs 4 --batch 16 --lr 2e-5
 
+  # Corpus de varios GB repartido en shards, leído en streaming
+  python scripts/ai/train_intent_classifier.py --streaming \
+    --train 'data/train-*.jsonl' --valid data/valid.csv --out ./models/intent-onnx
+
+  # Reentrenamiento incremental desde <out>/hf: sólo filas nuevas + repaso
+  python scripts/ai/train_intent_classifier.py ... --resume-from --epochs 1
+
+  # Barrido de hiperparámetros en paralelo con poda por mediana tras la 1ª época
+  echo '{"lr": [2e-5, 5e-5, 1e-4], "batch": [16, 32]}' > sweep.json
+  python scripts/ai/train_intent_classifier.py ... --sweep sweep.json
+
+  # Destilación: student de 1 capa / hidden 64 a partir de un teacher ya entrenado
+  python scripts/ai/train_intent_classifier.py ... \
+    --distill-from ./models/intent-teacher/hf --student-layers 1 --student-hidden 64
+
+  # Entrenamiento en CPU: 4 procesos DDP (gloo), 2 hilos por proceso
+  python scripts/ai/train_intent_classifier.py ... \
+    --ddp-cpu 4 --threads 2 --workers 2 --grad-accum 2
+
 El script genera:
-  - intent.onnx (modelo ONNX quantizado dinámicamente)
+  - intent.onnx (variante ONNX más rápida dentro de --acc-budget)
+  - export-manifest.json (tamaño, latencia y exactitud de cada variante)
   - labels.json (orden de etiquetas)
   - vocab.txt, tokenizer.json, config.json
+  - padding-report.json (tokens reales vs. padding por época)
+  - calibration.json (temperatura para escalar los logits antes del softmax)
+  - eval-report.json (confusión, top-k, ECE, deriva ONNX vs. PyTorch)
+  - distill-report.json (teacher vs. student, sólo con --distill-from)
+  - seen-rows.npy (hashes de filas ya entrenadas, para --resume-from)
+  - sweep-leaderboard.json (sólo con --sweep; los trials quedan en <out>/sweep/)
+
+Los datasets tokenizados se guardan en --cache-dir (por defecto <out>/cache) y se
+reutilizan mientras no cambien el tokenizer ni los archivos de datos.
 """
 
 import argparse
 import json
+import math
 import os
+import shutil
+import subprocess
+import sys
+import time
 from pathlib import Path
 
 import numpy as np
-from datasets import load_dataset, ClassLabel
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
-from transformers import DataCollatorWithPadding
-from sklearn.metrics import accuracy_score, f1_score
+import torch
+from datasets import Dataset
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
+from transformers import DataCollatorWithPadding, TrainerCallback
+
+from intent_data import (
+    PaddingStats, encode_labels, load_data, load_seen, save_seen, scan_labels, select_incremental,
+    streaming_dataset, tokenized_dataset,
+)
+from intent_distill import build_student, distill_report, distillation_loss, teacher_labels
+from intent_eval import basic_metrics, evaluation_report, logits_drift
+from intent_export import VARIANTS, calibration_dataset, run_export
+from intent_inference import IntentClassifier
+from intent_sweep import run_sweep
 
 def parse_args():
     p = argparse.ArgumentParser()
-    p.add_argument('--train', required=True, help='CSV/JSON train file with columns: text,label')
-    p.add_argument('--valid', required=True, help='CSV/JSON valid file with columns: text,label')
+    p.add_argument('--train', required=True, help='CSV/JSON train file (or shard glob) with columns: text,label')
+    p.add_argument('--valid', required=True, help='CSV/JSON valid file (or shard glob) with columns: text,label')
     p.add_argument('--out', required=True, help='Output folder')
     p.add_argument('--base', default='prajjwal1/bert-tiny', help='Base model name')
     p.add_argument('--epochs', type=int, default=4)
     p.add_argument('--batch', type=int, default=16)
     p.add_argument('--lr', type=float, default=2e-5)
-    return p.parse_args()
+    p.add_argument('--cache-dir', default=None, help='Caché de datasets tokenizados (por defecto <out>/cache)')
+    p.add_argument('--no-group-by-length', action='store_true',
+                   help='Desactiva el agrupado de lotes por longitud')
+    p.add_argument('--streaming', action='store_true',
+                   help='Lee --train de forma perezosa (memoria acotada); sin caché ni agrupado por longitud')
+    p.add_argument('--workers', type=int, default=0, help='Workers del DataLoader')
+    p.add_argument('--threads', type=int, default=None, help='Hilos intra-op de torch por proceso')
+    p.add_argument('--grad-accum', type=int, default=1, help='Pasos de acumulación de gradiente')
+    p.add_argument('--ddp-cpu', type=int, default=0, metavar='N',
+                   help='Lanza N procesos DDP sobre CPU (backend gloo)')
+    p.add_argument('--resume-from', nargs='?', const='', default=None, metavar='HF_DIR',
+                   help='Continúa desde un modelo entrenado (por defecto <out>/hf) usando sólo filas '
+                        'nuevas o modificadas más una muestra de repaso')
+    p.add_argument('--replay-ratio', type=float, default=0.5,
+                   help='Filas ya vistas a repasar, como proporción de las nuevas')
+    p.add_argument('--distill-from', default=None, metavar='TEACHER',
+                   help='Modelo teacher (carpeta HF) para entrenar un student más chico por destilación')
+    p.add_argument('--student-layers', type=int, default=1)
+    p.add_argument('--student-hidden', type=int, default=None,
+                   help='Hidden del student (por defecto el del teacher, inicializado con sus capas)')
+    p.add_argument('--distill-temp', type=float, default=2.0, help='Temperatura de los logits suavizados')
+    p.add_argument('--distill-alpha', type=float, default=0.5, help='Peso de la pérdida con etiquetas reales')
+    p.add_argument('--export-variants', default='dynamic-int8',
+                   help=f"Variantes ONNX separadas por coma: {','.join(VARIANTS)}")
+    p.add_argument('--acc-budget', type=float, default=0.01,
+                   help='Pérdida máxima de exactitud vs. FP32 para desplegar una variante')
+    p.add_argument('--quant-isa', default='avx2', choices=['arm64', 'avx2', 'avx512', 'avx512_vnni'],
+                   help='Conjunto de instrucciones objetivo de la quantización')
+    p.add_argument('--sweep', default=None, metavar='SPEC.json',
+                   help='Barrido de hiperparámetros: JSON {"lr": [...], "batch": [...], ...}')
+    p.add_argument('--sweep-jobs', type=int, default=None, help='Trials en paralelo (por defecto según núcleos)')
+    p.add_argument('--sweep-samples', type=int, default=None,
+                   help='Probar sólo N combinaciones al azar de la grilla')
+    p.add_argument('--prune-min-trials', type=int, default=3,
+                   help='Trials con primera evaluación necesarios antes de podar por mediana')
+    args = p.parse_args()
+    if args.resume_from is not None and (args.streaming or args.distill_from):
+        p.error('--resume-from no se combina con --streaming ni --distill-from')
+    if args.sweep and (args.streaming or args.ddp_cpu or args.resume_from is not None):
+        p.error('--sweep no se combina con --streaming, --ddp-cpu ni --resume-from')
+    return args
 
-def load_data(path):
-    ext = Path(path).suffix.lower()
-    if ext == '.csv':
-        return load_dataset('csv', data_files=path)
-    return load_dataset('json', data_files=path)
+def extend_classifier(model, labels):
+    """
+    Agrega a la cabeza de clasificación las etiquetas nuevas al final de `labels`,
+    conservando pesos y orden de las existentes (label2id estable).
+    """
+    old = model.config.num_labels
+    if len(labels) == old:
+        return model
+    head = model.classifier
+    linear = head.out_proj if hasattr(head, 'out_proj') else head
+    extended = torch.nn.Linear(linear.in_features, len(labels))
+    with torch.no_grad():
+        extended.weight[:old] = linear.weight
+        extended.bias[:old] = linear.bias
+    if hasattr(head, 'out_proj'):
+        head.out_proj = extended
+    else:
+        model.classifier = extended
+    model.num_labels = len(labels)
+    model.config.num_labels = len(labels)
+    model.config.id2label = dict(enumerate(labels))
+    model.config.label2id = {l: i for i, l in enumerate(labels)}
+    print(f'🧩 Cabeza extendida: {old} → {len(labels)} etiquetas ({labels[old:]})')
+    return model
 
-def main():
-    args = parse_args()
-    out = Path(args.out)
-    out.mkdir(parents=True, exist_ok=True)
+def launch_ddp_cpu(args):
+    """Relanza este script con torch.distributed.run en N procesos CPU."""
+    argv = []
+    skip = False
+    for a in sys.argv[1:]:
+        if skip:
+            skip = False
+            continue
+        if a == '--ddp-cpu':
+            skip = True
+            continue
+        if a.startswith('--ddp-cpu='):
+            continue
+        argv.append(a)
+    if args.threads is None:
+        # Repartir los núcleos entre procesos para no sobre-suscribir la CPU
+        argv += ['--threads', str(max(1, (os.cpu_count() or 1) // args.ddp_cpu))]
+    cmd = [
+        sys.executable, '-m', 'torch.distributed.run', '--standalone',
+        f'--nproc_per_node={args.ddp_cpu}', __file__, *argv,
+    ]
+    print('🚀 DDP CPU:', ' '.join(cmd))
+    return subprocess.call(cmd)
 
-    # Cargar datasets
-    ds_train = load_data(args.train)['train']
-    ds_valid = load_data(args.valid)['train']
+class ThroughputCallback(TrainerCallback):
+    """Registra samples/seg (todos los procesos) en cada paso de logging."""
 
-    # Construir etiquetas ordenadas
-    labels = sorted(set(ds_train['label']))
-    label2id = {l:i for i,l in enumerate(labels)}
-    id2label = {i:l for l,i in label2id.items()}
+    def on_train_begin(self, args, state, control, **kwargs):
+        self.start = time.perf_counter()
 
-    # Tokenizer y modelo
-    tokenizer = AutoTokenizer.from_pretrained(args.base)
-    def tokenize(batch):
-        return tokenizer(batch['text'], truncation=True)
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if not state.is_world_process_zero or not state.global_step:
+            return
+        samples = state.global_step * args.train_batch_size * args.gradient_accumulation_steps * args.world_size
+        elapsed = time.perf_counter() - self.start
+        print(f'⚡ paso {state.global_step}: {samples / elapsed:.1f} samples/seg')
 
-    ds_train = ds_train.map(lambda x: {'labels': label2id[x['label']]})
-    ds_valid = ds_valid.map(lambda x: {'labels': label2id[x['label']]})
-    ds_train = ds_train.map(tokenize, batched=True)
-    ds_valid = ds_valid.map(tokenize, batched=True)
-    data_collator = DataCollatorWithPadding(tokenizer=tokenizer)
+class IntentTrainer(Trainer):
+    """
+    Trainer que alimenta PaddingStats con la attention_mask de cada lote y que,
+    si recibe un teacher, entrena por destilación sobre sus logits.
+    """
 
-    model = AutoModelForSequenceClassification.from_pretrained(
-        args.base,
-        num_labels=len(labels),
-        id2label=id2label,
-        label2id=label2id,
-    )
+    def __init__(self, *args, padding_stats=None, teacher=None, distill_temp=2.0, distill_alpha=0.5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.padding_stats = padding_stats
+        self.teacher = teacher.to(self.args.device).eval() if teacher is not None else None
+        self.distill_temp = distill_temp
+        self.distill_alpha = distill_alpha
 
-    def compute_metrics(eval_pred):
-        logits, y = eval_pred
-        y_pred = np.argmax(logits, axis=-1)
-        return {
-            'acc': accuracy_score(y, y_pred),
-            'f1': f1_score(y, y_pred, average='macro'),
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        if self.teacher is None:
+            return super().compute_loss(model, inputs, return_outputs=return_outputs, **kwargs)
+        labels = inputs.pop('labels')
+        outputs = model(**inputs)
+        with torch.no_grad():
+            teacher_logits = self.teacher(**inputs).logits
+        loss = distillation_loss(outputs.logits, teacher_logits, labels,
+                                 self.distill_temp, self.distill_alpha)
+        return (loss, outputs) if return_outputs else loss
+
+    def training_step(self, model, inputs, *args, **kwargs):
+        if self.padding_stats is not None and 'attention_mask' in inputs:
+            self.padding_stats.update(inputs['attention_mask'])
+        return super().training_step(model, inputs, *args, **kwargs)
+
+def train(args, callbacks=(), export=True):
+    """
+    Entrena (y, si export, exporta) con los argumentos de parse_args.
+
+    Devuelve las métricas del entrenamiento en el proceso principal; None en el
+    resto de los procesos DDP o si no había filas nuevas que entrenar.
+    """
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    distributed = int(os.environ.get('WORLD_SIZE', '1')) > 1
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    schedule = {'evaluation_strategy': 'epoch', 'save_strategy': 'epoch'}
+    if args.streaming:
+        # Una pasada acotada en memoria: vocabulario de etiquetas + número de filas.
+        # Con un IterableDataset el Trainer necesita max_steps explícito.
+        label_counts = scan_labels(args.train)
+        labels = sorted(label_counts)
+        world_size = int(os.environ.get('WORLD_SIZE', '1'))
+        steps_per_epoch = math.ceil(sum(label_counts.values()) / (args.batch * args.grad_accum * world_size))
+        schedule = {
+            'evaluation_strategy': 'steps', 'save_strategy': 'steps',
+            'eval_steps': steps_per_epoch, 'save_steps': steps_per_epoch,
+            'max_steps': steps_per_epoch * args.epochs,
         }
+        print(f'🌊 Streaming: {sum(label_counts.values())} filas, {len(labels)} etiquetas, '
+              f'{steps_per_epoch} pasos/época')
 
     training_args = TrainingArguments(
         output_dir=str(out / 'checkpoints'),
-        evaluation_strategy='epoch',
-        save_strategy='epoch',
+        **schedule,
         load_best_model_at_end=True,
         metric_for_best_model='f1',
         num_train_epochs=args.epochs,
         per_device_train_batch_size=args.batch,
         per_device_eval_batch_size=args.batch,
+        gradient_accumulation_steps=args.grad_accum,
         learning_rate=args.lr,
         weight_decay=0.01,
         report_to=[],
         logging_steps=50,
+        group_by_length=not (args.no_group_by_length or args.streaming),
+        length_column_name='length',
+        dataloader_num_workers=args.workers,
+        dataloader_persistent_workers=args.workers > 0,
+        use_cpu=distributed,
+        ddp_backend='gloo' if distributed else None,
     )
 
-    trainer = Trainer(
+    # Tokenizer y datasets tokenizados (cacheados en Arrow).
+    # Con DDP el proceso principal llena la caché y el resto la reutiliza.
+    # Con destilación el student hereda tokenizer y orden de etiquetas del teacher;
+    # en modo incremental se parte del modelo ya entrenado
+    teacher = None
+    if args.distill_from:
+        teacher = AutoModelForSequenceClassification.from_pretrained(args.distill_from)
+    resume_dir = None
+    if args.resume_from is not None:
+        resume_dir = Path(args.resume_from or out / 'hf')
+    tokenizer = AutoTokenizer.from_pretrained(resume_dir or args.distill_from or args.base)
+    cache_dir = args.cache_dir or str(out / 'cache')
+    with training_args.main_process_first(desc='tokenización'):
+        if not args.streaming:
+            ds_train = tokenized_dataset(args.train, tokenizer, cache_dir)
+            # Construir etiquetas ordenadas
+            labels = sorted(ds_train.unique('label'))
+        ds_valid = tokenized_dataset(args.valid, tokenizer, cache_dir)
+
+    if teacher is not None:
+        missing = set(labels) - set(teacher_labels(teacher))
+        if missing:
+            raise ValueError(f'Etiquetas que el teacher no conoce: {sorted(missing)}')
+        labels = teacher_labels(teacher)
+    if resume_dir is not None:
+        # Orden previo intacto; las etiquetas nuevas se agregan al final
+        previous = AutoConfig.from_pretrained(resume_dir)
+        old_labels = [previous.id2label[i] for i in range(previous.num_labels)]
+        labels = old_labels + sorted(set(labels) - set(old_labels))
+    label2id = {l:i for i,l in enumerate(labels)}
+    id2label = {i:l for l,i in label2id.items()}
+
+    if args.streaming:
+        ds_train = streaming_dataset(args.train, tokenizer, label2id)
+        calibration = Dataset.from_list(list(ds_train.take(256)))
+    else:
+        ds_train = encode_labels(ds_train, label2id)
+        calibration = ds_train
+    full_train = ds_train
+    # Sin --resume-from es un entrenamiento desde cero: no heredar hashes de otra corrida en `out`
+    seen = np.empty(0, dtype=np.int64)
+    if resume_dir is not None:
+        seen = load_seen(resume_dir.parent / 'seen-rows.npy')
+        if not len(seen):
+            print('⚠️  Sin seen-rows.npy previo: se reentrena con todas las filas desde el checkpoint')
+        ds_train = select_incremental(ds_train, seen, args.replay_ratio)
+        if not len(ds_train):
+            print('✅ No hay filas nuevas ni modificadas: nada que entrenar')
+            return None
+    ds_valid = encode_labels(ds_valid, label2id)
+    data_collator = DataCollatorWithPadding(tokenizer=tokenizer)
+    padding_stats = PaddingStats(out / 'padding-report.json')
+
+    if teacher is not None:
+        model = build_student(args.distill_from, args.student_layers, args.student_hidden)
+    elif resume_dir is not None:
+        model = extend_classifier(AutoModelForSequenceClassification.from_pretrained(resume_dir), labels)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(
+            args.base,
+            num_labels=len(labels),
+            id2label=id2label,
+            label2id=label2id,
+        )
+
+    def compute_metrics(eval_pred):
+        logits, y = eval_pred
+        return basic_metrics(logits, y)
+
+    trainer = IntentTrainer(
         model=model,
         args=training_args,
         train_dataset=ds_train,
@@ -109,47 +343,107 @@ def main():
         tokenizer=tokenizer,
         data_collator=data_collator,
         compute_metrics=compute_metrics,
+        callbacks=[padding_stats, ThroughputCallback(), *callbacks],
+        padding_stats=padding_stats,
+        teacher=teacher,
+        distill_temp=args.distill_temp,
+        distill_alpha=args.distill_alpha,
     )
-    trainer.train()
+    result = trainer.train()
+    # predict es colectivo bajo --ddp-cpu (sampler distribuido + gather): todos los
+    # rangos deben llamarlo antes de que los que no son el 0 retornen
+    torch_logits = trainer.predict(ds_valid).predictions if export else None
+    if not trainer.is_world_process_zero():
+        return None
+    print(f"⚡ Entrenamiento: {result.metrics['train_samples_per_second']:.1f} samples/seg "
+          f"en {result.metrics['train_runtime']:.1f}s")
+    metrics = {
+        'best_f1': trainer.state.best_metric,
+        'epochs': trainer.state.epoch,
+        'train_samples_per_second': result.metrics['train_samples_per_second'],
+        'train_runtime': result.metrics['train_runtime'],
+    }
+    if not export:
+        return metrics
     trainer.save_model(str(out / 'hf'))
     tokenizer.save_pretrained(str(out / 'hf'))
 
-    # Guardar labels
+    if teacher is not None:
+        print('\n🎓 Teacher vs. student:')
+        distill_report(teacher, trainer.model, ds_valid, data_collator, out / 'distill-report.json')
+
+    # Guardar labels (y la temperatura de calibración al lado: labels.json sigue
+    # siendo una lista porque así lo lee apps/patients)
     with open(out / 'labels.json', 'w') as f:
         json.dump(labels, f)
 
-    # Exportar a ONNX
-    # Nota: optimum debe estar instalado; invocamos CLI vía os.system por simplicidad
-    onnx_dir = out / 'onnx'
-    onnx_dir.mkdir(exist_ok=True)
-    os.system(f"optimum-cli export onnx --task text-classification --model {out/'hf'} {onnx_dir}")
+    # Evaluación completa sobre validación: confusión, top-k, ECE y temperature scaling
+    report = evaluation_report(torch_logits, np.asarray(ds_valid['labels']), labels)
+    with open(out / 'calibration.json', 'w') as f:
+        json.dump({'temperature': report['calibration']['temperature']}, f)
+    cal = report['calibration']
+    print(f"📐 acc={report['acc']:.4f} f1={report['f1_macro']:.4f} "
+          f"ECE {cal['ece']:.4f} → {cal['ece_calibrated']:.4f} con T={cal['temperature']:.3f}")
 
-    # Quantize
-    onnxq_dir = out / 'onnx-quant'
-    onnxq_dir.mkdir(exist_ok=True)
-    os.system(f"optimum-cli onnxruntime quantize --model {onnx_dir} --output {onnxq_dir} --approach dynamic")
-
-    # Renombrar a intent.onnx y copiar vocab/labels
-    src_model = onnxq_dir / 'model.onnx'
-    if not src_model.exists():
-        src_model = onnx_dir / 'model.onnx'
-    (out / 'intent.onnx').write_bytes(src_model.read_bytes())
+    # Registrar las filas entrenadas para la próxima corrida incremental
+    if not args.streaming:
+        save_seen(out / 'seen-rows.npy', seen, full_train)
 
     # Copiar vocab/tokenizer
     # Algunos tokenizers tienen vocab.txt; en su defecto, dejamos tokenizer.json
-    if (out / 'hf' / 'vocab.txt').exists():
-        (out / 'vocab.txt').write_bytes((out / 'hf' / 'vocab.txt').read_bytes())
-    if (out / 'hf' / 'tokenizer.json').exists():
-        (out / 'tokenizer.json').write_bytes((out / 'hf' / 'tokenizer.json').read_bytes())
-    if (out / 'hf' / 'config.json').exists():
-        (out / 'config.json').write_bytes((out / 'hf' / 'config.json').read_bytes())
+    for name in ('vocab.txt', 'tokenizer.json', 'config.json'):
+        if (out / 'hf' / name).exists():
+            shutil.copyfile(out / 'hf' / name, out / name)
+
+    # Exportar a ONNX, generar variantes y desplegar la más rápida como intent.onnx
+    # (mismo truncado que en entrenamiento/validación para comparar exactitudes)
+    max_length = min(tokenizer.model_max_length, 512)
+    raw_valid = load_data(args.valid)['train']
+    run_export(
+        out,
+        out / 'hf',
+        raw_valid['text'],
+        raw_valid['label'],
+        variants=[v for v in args.export_variants.split(',') if v],
+        acc_budget=args.acc_budget,
+        calibration_ds=calibration_dataset(calibration),
+        isa=args.quant_isa,
+        max_length=max_length,
+    )
+
+    # Deriva ONNX (intent.onnx desplegado) vs. PyTorch sobre las mismas filas
+    clf = IntentClassifier(out, cache_size=0, max_length=max_length)
+    texts = raw_valid['text']
+    onnx_logits = np.concatenate([clf.logits(texts[i:i + 64]) for i in range(0, len(texts), 64)])
+    report['onnx_vs_torch'] = logits_drift(torch_logits, onnx_logits)
+    print(f"📐 ONNX vs. PyTorch: max |Δlogit| {report['onnx_vs_torch']['max_abs']:.4f}, "
+          f"argmax coincide en {report['onnx_vs_torch']['argmax_agreement']:.2%}")
+    with open(out / 'eval-report.json', 'w') as f:
+        json.dump(report, f, indent=2)
 
     print('\n✅ Listo. Archivos generados en:', out)
     print(' - intent.onnx')
-    print(' - labels.json')
+    print(' - export-manifest.json')
+    print(' - labels.json, calibration.json')
+    print(' - eval-report.json')
     print(' - vocab.txt (si disponible)')
     print(' - tokenizer.json, config.json')
+    print(' - padding-report.json')
+    if not args.streaming:
+        print(' - seen-rows.npy')
+    if teacher is not None:
+        print(' - distill-report.json')
+    return metrics
+
+def main():
+    args = parse_args()
+    if args.sweep:
+        return run_sweep(args)
+    if args.ddp_cpu:
+        return launch_ddp_cpu(args)
+    train(args)
+    return 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
 
@@ -4,17 +4,149 @@ AutaMedica - Post Task Report
 Genera reporte consolidado después de cada tarea del agente
 """
 
+import argparse
+import bisect
+import ctypes
+import ctypes.util
+import gzip
+import hashlib
+import html
+import io
 import json
-import glob
+import math
+import mmap
 import os
+import re
+import selectors
+import shutil
+import socket
+import statistics
+import struct
 import datetime
+import subprocess
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, TextIO, Tuple
 
 PROJECT_ROOT = Path(__file__).parent.parent
 GENERATED_DOCS = PROJECT_ROOT / "generated-docs"
 LOGS_DIR = PROJECT_ROOT / ".logs"
 
+DOCS_PREFIX = GENERATED_DOCS.relative_to(PROJECT_ROOT).as_posix() + "/"
+
+# Índice persistente: path + mtime + size -> resumen ya parseado de cada *-report.json
+INDEX_PATH = GENERATED_DOCS / ".post-task-index.json"
+INDEX_VERSION = 3
+
+# Historial append-only: una fila JSONL por ejecución con las métricas numéricas de cada reporte
+HISTORY_PATH = GENERATED_DOCS / ".post-task-history.jsonl"
+BASELINE_COMMITS = 5
+REGRESSION_THRESHOLD = 0.10
+
+# Heurística de dirección por nombre de métrica (+1: subir empeora, -1: bajar empeora)
+WORSE_WHEN_HIGHER = ("fail", "error", "violation", "warning", "ms", "duration", "time",
+                     "latency", "bytes", "size", "flaky", "skipped")
+WORSE_WHEN_LOWER = ("pass", "success", "score", "coverage", "ok")
+
+# Lectura en streaming de *-report.json: sólo se buscan estas claves de primer nivel
+REPORT_KEYS = ("summary", "timestamp")
+STREAM_CHUNK = 64 * 1024
+# Si el lector en streaming falla, json.load completo sólo hasta este tamaño
+FALLBACK_MAX_BYTES = 32 * 1024 * 1024
+# Tamaño máximo de un valor decodificado en streaming (claves, summary, timestamp)
+DECODE_MAX_CHARS = 1024 * 1024
+
+# Con --jobs > 1, sólo se abre el pool si hay al menos esta cantidad de reportes a parsear
+PARALLEL_MIN_REPORTS = 8
+
+# Render Markdown/HTML: elementos por sección y caracteres por resumen (0 = sin límite)
+SECTION_LIMIT = 500
+SUMMARY_MAX_CHARS = 4000
+
+# Retención: sufijos que se podan por tipo y logs comprimidos que siguen contando como runs
+RETAINED_DOC_SUFFIXES = ("-report.json", ".png")
+COMPRESSED_LOG_SUFFIXES = (".gz", ".zst")
+HASH_CHUNK = 1024 * 1024
+# Fechas ISO (con hora opcional) o secuencias de 4+ dígitos (timestamps, ids de run)
+_RUN_ID = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T_-]\d{2}[-:]?\d{2}(?:[-:]?\d{2}(?:\.\d+)?)?Z?)?|\d{4,}")
+
+try:
+    import zstandard
+except ImportError:  # opcional: sin zstandard se comprime con gzip
+    zstandard = None
+
+# Catálogo de screenshots: miniaturas WebP cacheadas por hash de contenido + pHash
+THUMBS_DIR = GENERATED_DOCS / ".thumbs"
+# Ancho fijo y sólo la parte superior: un full-page reducido entero queda ilegible
+THUMB_WIDTH = 320
+THUMB_MAX_HEIGHT = 480
+THUMB_QUALITY = 70
+# Distancia de Hamming máxima (pHash de 64 bits) para considerar dos screenshots casi iguales
+PHASH_DISTANCE = 6
+
+_imaging_modules: Optional[Tuple[Any, Any]] = None
+
+def _imaging() -> Tuple[Any, Any]:
+    """
+    (PIL.Image, imagehash), o None en los que no estén instalados. Import diferido:
+    imagehash arrastra numpy/scipy y no debe pesar en `--flush`/`--stop`.
+    """
+
+    global _imaging_modules
+    if _imaging_modules is None:
+        try:
+            from PIL import Image
+        except ImportError:  # opcional: sin Pillow no hay miniaturas
+            Image = None
+        try:
+            import imagehash
+        except ImportError:  # opcional: sin imagehash sólo se agrupan duplicados exactos
+            imagehash = None
+        _imaging_modules = (Image, imagehash)
+    return _imaging_modules
+
+# Digestión de .logs/*.log: regex sobre el archivo mapeado en memoria (sin cargarlo entero)
+LOG_READ_CHUNK = 8 * 1024 * 1024
+MAX_FINGERPRINTS = 200
+SAMPLE_CHARS = 200
+# Buckets del histograma de tiempos (ms, límite superior inclusive; el último es +Inf)
+TIMING_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# A lo sumo un match por línea: la búsqueda sigue a mitad de línea y ^ no vuelve a coincidir
+_ERROR_LINE = re.compile(rb"^[^\n]*?\b(?:ERROR|Error|FATAL|Fatal|CRITICAL|Exception|Traceback|Unhandled)\b", re.M)
+_WARN_LINE = re.compile(rb"^[^\n]*?\b(?:WARN|WARNING|Warning)\b", re.M)
+_PY_TRACE = re.compile(
+    rb"^Traceback \(most recent call last\):\r?\n((?:[ \t]+.*\r?\n)+)(\S.*)$", re.M)
+_JS_TRACE = re.compile(
+    rb"^(\S.*?(?:Error|Exception)\b.*)\r?\n((?:[ \t]+at .*(?:\r?\n|$))+)", re.M)
+_PY_FRAME = re.compile(rb'File "(?:[^"]*[/\\])?([^"/\\]+)", line \d+, in (\S+)')
+_JS_FRAME = re.compile(rb"at (?:(\S+) \()?(?:[^()\s]*[/\\])?([^()/\\:\s]+)(?::\d+)*\)?")
+_TIMING = re.compile(
+    rb"(?:\b(?:took|duration|elapsed|latency|time|in)\b[\s:=]*|\()(\d+(?:\.\d+)?)\s?(ms|s)\b\)?", re.I)
+
+# Export de métricas para el scraper/pushgateway local
+METRICS_DIR = GENERATED_DOCS
+METRICS_PREFIX = "autamedica"
+
+# Modo --watch: socket del daemon para `--flush` y archivos propios que no disparan regeneración
+SOCKET_PATH = GENERATED_DOCS / ".post-task.sock"
+OWN_OUTPUTS = {
+    "POST_TASK_REPORT.json", "POST_TASK_REPORT.md", "POST_TASK_REPORT.html",
+    "POST_TASK_METRICS.prom", "POST_TASK_METRICS.jsonl",
+}
+WATCH_DEBOUNCE = 2.0
+POLL_INTERVAL = 1.0
+
+# inotify(7): eventos que cambian el contenido o la presencia de un archivo
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
 # Colors para terminal
 class Colors:
     CYAN = '\033[96m'
@@ -26,69 +158,876 @@ class Colors:
 def log(msg: str, color: str = Colors.RESET):
     print(f"{color}{msg}{Colors.RESET}")
 
-def collect_artifacts() -> Dict[str, Any]:
+def _scan_dir(directory: Path, suffix: str = "") -> Dict[str, Tuple[int, int]]:
+    """Un único recorrido del directorio: nombre -> (mtime_ns, size)"""
+
+    entries = {}
+    if not directory.exists():
+        return entries
+
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.name.endswith(suffix) or not entry.is_file():
+                continue
+            st = entry.stat()
+            entries[entry.name] = (st.st_mtime_ns, st.st_size)
+
+    return entries
+
+def scan_artifacts() -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """Stat de generated-docs y .logs una sola vez por ejecución"""
+
+    docs = _scan_dir(GENERATED_DOCS)
+    docs.pop(INDEX_PATH.name, None)
+    docs.pop(HISTORY_PATH.name, None)
+    return {"docs": docs, "logs": _scan_dir(LOGS_DIR, ".log")}
+
+def load_index() -> Dict[str, Any]:
+    """Carga el índice persistente (vacío si no existe o cambió de versión)"""
+
+    try:
+        with open(INDEX_PATH, 'r') as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (json.JSONDecodeError, IOError):
+        pass
+    return {"version": INDEX_VERSION, "reports": {}, "logs": {}}
+
+def save_index(index: Dict[str, Any]):
+    GENERATED_DOCS.mkdir(parents=True, exist_ok=True)
+    tmp_path = INDEX_PATH.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        # json.dumps usa el encoder en C; json.dump a archivo usa el de Python
+        f.write(json.dumps(index, separators=(",", ":")))
+    os.replace(tmp_path, INDEX_PATH)
+
+def collect_artifacts(scan: Optional[Dict[str, Dict[str, Tuple[int, int]]]] = None) -> Dict[str, Any]:
     """Recolecta todos los artefactos generados"""
 
-    artifacts = {
-        "docs": [],
-        "logs": [],
-        "screenshots": [],
-        "reports": [],
+    if scan is None:
+        scan = scan_artifacts()
+
+    docs_prefix = str(GENERATED_DOCS.relative_to(PROJECT_ROOT)) + os.sep
+    logs_prefix = str(LOGS_DIR.relative_to(PROJECT_ROOT)) + os.sep
+    doc_names = sorted(scan["docs"])
+
+    return {
+        "docs": [docs_prefix + name for name in doc_names],
+        "logs": sorted(logs_prefix + name for name in scan["logs"]),
+        "screenshots": [docs_prefix + name for name in doc_names if name.endswith(".png")],
+        "reports": [docs_prefix + name for name in doc_names if name.endswith("-report.json")],
     }
 
-    # Documentos generados
+def artifact_type(name: str) -> str:
+    """
+    Tipo de artefacto: el nombre sin fechas/ids de run ni sufijo de compresión
+    (login-2025-01-31T10-00-00-report.json -> login-#-report.json). Los números
+    cortos (check1, check2) se consideran artefactos distintos.
+    """
+
+    for suffix in COMPRESSED_LOG_SUFFIXES:
+        if name.endswith(".log" + suffix):
+            name = name[:-len(suffix)]
+    return _RUN_ID.sub("#", name)
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _compress_log(path: Path) -> Path:
+    """Comprime un log en streaming (zstd si está instalado, si no gzip) y borra el original"""
+
+    if zstandard is not None:
+        target = path.with_name(path.name + ".zst")
+        with open(path, 'rb') as src, open(target, 'wb') as dst:
+            with zstandard.ZstdCompressor(level=10).stream_writer(dst) as writer:
+                shutil.copyfileobj(src, writer, HASH_CHUNK)
+    else:
+        target = path.with_name(path.name + ".gz")
+        with open(path, 'rb') as src, gzip.open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, HASH_CHUNK)
+    # Conservar el mtime para que el orden de retención no cambie
+    shutil.copystat(path, target)
+    path.unlink()
+    return target
+
+def _dedupe_screenshots(dry_run: bool, skip: Optional[set] = None) -> Tuple[int, int]:
+    """
+    Reemplaza PNGs byte-idénticos por hardlinks al primero; devuelve (archivos, bytes).
+    Sólo se enlazan screenshots con fecha/id de run en el nombre: se escriben una vez y
+    no se vuelven a tocar. Los de nombre fijo (login.png) los sobrescribe el siguiente
+    run en el mismo inode, lo que cambiaría también todas sus copias enlazadas.
+    """
+
+    skip = skip or set()
+    by_size: Dict[int, List[os.DirEntry]] = {}
     if GENERATED_DOCS.exists():
-        artifacts["docs"] = sorted([
-            str(f.relative_to(PROJECT_ROOT))
-            for f in GENERATED_DOCS.glob("*")
-            if f.is_file()
-        ])
-
-    # Logs
-    if LOGS_DIR.exists():
-        artifacts["logs"] = sorted([
-            str(f.relative_to(PROJECT_ROOT))
-            for f in LOGS_DIR.glob("*.log")
-        ])
-
-    # Screenshots
-    artifacts["screenshots"] = sorted([
-        str(f.relative_to(PROJECT_ROOT))
-        for f in GENERATED_DOCS.glob("*.png")
-    ]) if GENERATED_DOCS.exists() else []
-
-    # Reportes JSON
-    artifacts["reports"] = sorted([
-        str(f.relative_to(PROJECT_ROOT))
-        for f in GENERATED_DOCS.glob("*-report.json")
-    ]) if GENERATED_DOCS.exists() else []
-
-    return artifacts
-
-def load_report_summaries() -> List[Dict[str, Any]]:
-    """Carga resúmenes de reportes JSON existentes"""
+        with os.scandir(GENERATED_DOCS) as it:
+            for entry in it:
+                if (entry.name.endswith(".png") and entry.name not in skip
+                        and artifact_type(entry.name) != entry.name and entry.is_file()):
+                    by_size.setdefault(entry.stat().st_size, []).append(entry)
 
-    summaries = []
+    linked = reclaimed = 0
+    for size, entries in by_size.items():
+        # Sólo se hashean archivos con el mismo tamaño que otro
+        if len(entries) < 2:
+            continue
+        originals: Dict[str, os.DirEntry] = {}
+        for entry in sorted(entries, key=lambda e: e.name):
+            digest = _file_digest(Path(entry.path))
+            original = originals.setdefault(digest, entry)
+            if original is entry or entry.inode() == original.inode():
+                continue
+            linked += 1
+            reclaimed += size
+            if not dry_run:
+                tmp_path = Path(entry.path + ".link")
+                os.link(original.path, tmp_path)
+                os.replace(tmp_path, entry.path)
+
+    return linked, reclaimed
+
+def apply_retention(keep: int, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Poda generated-docs y .logs: conserva los últimos `keep` runs (por mtime) de cada tipo
+    de reporte, screenshot y log; comprime los logs conservados salvo el más reciente y
+    deduplica screenshots idénticos con hardlinks. Con dry_run sólo informa.
+    """
+
+    if keep < 1:
+        raise ValueError(f"keep debe ser >= 1 (recibido: {keep})")
+
+    stats = {"deleted": 0, "compressed": 0, "linked": 0, "bytes_reclaimed": 0, "bytes_to_compress": 0}
+    deleted = set()
+
+    docs = {name: meta for name, meta in _scan_dir(GENERATED_DOCS).items()
+            if name.endswith(RETAINED_DOC_SUFFIXES)}
+    logs = {name: meta for name, meta in _scan_dir(LOGS_DIR).items()
+            if name.endswith(".log") or name.endswith(tuple(".log" + s for s in COMPRESSED_LOG_SUFFIXES))}
+
+    for directory, entries in ((GENERATED_DOCS, docs), (LOGS_DIR, logs)):
+        groups: Dict[str, List[str]] = {}
+        for name in entries:
+            groups.setdefault(artifact_type(name), []).append(name)
+
+        for names in groups.values():
+            # Más reciente primero; el nombre desempata para que el orden sea estable
+            names.sort(key=lambda n: (entries[n][0], n), reverse=True)
+            for name in names[keep:]:
+                stats["deleted"] += 1
+                stats["bytes_reclaimed"] += entries[name][1]
+                deleted.add(name)
+                if not dry_run:
+                    (directory / name).unlink()
+
+            if directory != LOGS_DIR:
+                continue
+            for name in names[1:keep]:
+                if not name.endswith(".log"):
+                    continue
+                stats["compressed"] += 1
+                stats["bytes_to_compress"] += entries[name][1]
+                if not dry_run:
+                    target = _compress_log(directory / name)
+                    stats["bytes_reclaimed"] += entries[name][1] - target.stat().st_size
+
+    stats["linked"], linked_bytes = _dedupe_screenshots(dry_run, deleted)
+    stats["bytes_reclaimed"] += linked_bytes
+    return stats
+
+_JSON_WS = " \t\r\n"
+# String completo (bucle desenrollado), llave/corchete o comilla de un string sin cerrar
+_SKIP_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|"')
+_STRING_END = re.compile(r'["\\]')
+_NUMBER_TAIL = re.compile(r'[0-9eE.+-]*')
+_decoder = json.JSONDecoder()
+# Lo más que ocupa el token que falla cuando el bloque lo corta (una escape \uXXX incompleta)
+_CUT_TOKEN_CHARS = 6
+
+def _cut_by_chunk(error: json.JSONDecodeError, buf_len: int) -> bool:
+    """True si el error puede deberse a que el bloque terminó en medio del valor"""
+
+    return error.msg.startswith("Unterminated string") or buf_len - error.pos <= _CUT_TOKEN_CHARS
+
+class _TopLevelReader:
+    """Cursor sobre un JSON leído por bloques; conserva sólo el bloque en curso"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        chunk = self.f.read(STREAM_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter que no sea espacio ('' al final del archivo)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _JSON_WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"se esperaba {char!r} en el JSON")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        """Decodifica el valor en el cursor (pensado para valores chicos como summary)"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Un error de sintaxis en medio del bloque no se arregla leyendo más:
+                # se propaga enseguida para que parse_report haga el fallback
+                if not _cut_by_chunk(e, len(self.buf)) or not self._fill_value():
+                    raise
+                continue
+            # Un número cortado por el bloque ("-2.5" de "-2.5e3") puede seguir en el próximo
+            if not self.eof and _NUMBER_TAIL.fullmatch(self.buf, end) and self._fill_value():
+                continue
+            self.pos = end
+            return value
+
+    def _fill_value(self) -> bool:
+        """fill() para decode_value, con tope: el valor pendiente no crece sin límite"""
+        if len(self.buf) - self.pos > DECODE_MAX_CHARS:
+            raise ValueError(f"valor JSON de más de {DECODE_MAX_CHARS} caracteres")
+        return self.fill()
+
+    def _skip_open_string(self, i: int) -> int:
+        """Avanza hasta el cierre de un string largo abierto antes de i, bloque por bloque"""
+        while True:
+            m = _STRING_END.search(self.buf, i)
+            if m is None or (m.group() == "\\" and m.end() >= len(self.buf)):
+                # Conservar un posible escape partido entre bloques
+                self.pos = m.start() if m is not None else len(self.buf)
+                if not self.fill():
+                    raise ValueError("JSON truncado")
+                i = self.pos
+                continue
+            if m.group() == "\\":
+                i = m.end() + 1
+                continue
+            return m.end()
+
+    def skip_value(self):
+        """Salta el valor en el cursor sin materializarlo, bloque por bloque"""
+        if self.peek() not in "{[\"":
+            self.decode_value()
+            return
+
+        depth = 0
+        i = self.pos
+        while True:
+            m = _SKIP_TOKEN.search(self.buf, i)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise ValueError("JSON truncado")
+                i = self.pos
+                continue
+
+            token = m.group()
+            i = m.end()
+            if token == '"':
+                # String que no cierra dentro del bloque actual
+                i = self._skip_open_string(i)
+            elif token in "{[":
+                depth += 1
+                continue
+            elif token in "}]":
+                depth -= 1
+            if depth == 0:
+                self.pos = i
+                return
+
+def read_report_fields(path: Path, keys: Tuple[str, ...] = REPORT_KEYS) -> Dict[str, Any]:
+    """
+    Lee sólo las claves de primer nivel pedidas y se detiene al encontrarlas todas.
+    Memoria y tiempo no dependen del tamaño de los valores que se saltan.
+    """
 
-    if not GENERATED_DOCS.exists():
-        return summaries
+    found = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _TopLevelReader(f)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return found
+        while len(found) < len(keys):
+            if reader.peek() != '"':
+                raise ValueError("clave JSON inválida")
+            key = reader.decode_value()
+            reader.expect(":")
+            if key in keys and key not in found:
+                found[key] = reader.decode_value()
+            else:
+                reader.skip_value()
+            char = reader.peek()
+            if char == "}":
+                break
+            reader.expect(",")
+    return found
 
-    for report_file in GENERATED_DOCS.glob("*-report.json"):
+def parse_report(path: Path, size: int) -> Dict[str, Any]:
+    """Resumen de un *-report.json: streaming y, si falla, json.load si el archivo es chico"""
+
+    try:
+        data = read_report_fields(path)
+    except (ValueError, IOError) as stream_error:
+        if size > FALLBACK_MAX_BYTES:
+            return {"error": f"JSON inválido: {stream_error}"}
         try:
-            with open(report_file, 'r') as f:
+            with open(path, 'r') as f:
                 data = json.load(f)
-                summaries.append({
-                    "file": report_file.name,
-                    "summary": data.get("summary", {}),
-                    "timestamp": data.get("timestamp", "unknown")
-                })
-        except (json.JSONDecodeError, IOError) as e:
-            log(f"⚠️  Error leyendo {report_file.name}: {e}", Colors.YELLOW)
+            if not isinstance(data, dict):
+                return {"error": "el reporte no es un objeto JSON"}
+        except (ValueError, IOError) as e:
+            return {"error": str(e)}
+
+    return {
+        "summary": data.get("summary", {}),
+        "timestamp": data.get("timestamp", "unknown"),
+    }
+
+def _stale(entries: Dict[str, Tuple[int, int]], cached: Dict[str, Any]) -> List[str]:
+    """Nombres sin entrada en el índice o con mtime/size distintos"""
+
+    return [
+        name for name in sorted(entries)
+        if name not in cached
+        or cached[name]["mtime_ns"] != entries[name][0]
+        or cached[name]["size"] != entries[name][1]
+    ]
+
+def _parse_parallel(func, paths: List[Path], sizes: List[int], jobs: int) -> List[Dict[str, Any]]:
+    """Aplica func(path, size), en paralelo si hay trabajo suficiente; conserva el orden"""
+
+    if jobs <= 1 or len(paths) < PARALLEL_MIN_REPORTS:
+        return [func(path, size) for path, size in zip(paths, sizes)]
+
+    workers = min(jobs, len(paths))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map devuelve los resultados en el orden de entrada: salida determinística
+        return list(pool.map(func, paths, sizes, chunksize=max(1, len(paths) // (workers * 4))))
+
+def load_report_summaries(scan: Optional[Dict[str, Dict[str, Tuple[int, int]]]] = None,
+                          index: Optional[Dict[str, Any]] = None,
+                          jobs: int = 1) -> List[Dict[str, Any]]:
+    """Carga resúmenes de reportes JSON existentes, re-leyendo sólo los que cambiaron"""
+
+    if scan is None:
+        scan = scan_artifacts()
+    if index is None:
+        index = {"version": INDEX_VERSION, "reports": {}, "logs": {}}
+
+    summaries = []
+    cached = index["reports"]
+    names = sorted(n for n in scan["docs"] if n.endswith("-report.json"))
+
+    stale = _stale({name: scan["docs"][name] for name in names}, cached)
+    parsed = _parse_parallel(parse_report, [GENERATED_DOCS / name for name in stale],
+                             [scan["docs"][name][1] for name in stale], jobs)
+    for name, result in zip(stale, parsed):
+        mtime_ns, size = scan["docs"][name]
+        cached[name] = {"mtime_ns": mtime_ns, "size": size, **result}
+
+    fresh = {}
+
+    for name in names:
+        entry = cached[name]
+        fresh[name] = entry
 
+        if "error" in entry:
+            log(f"⚠️  Error leyendo {name}: {entry['error']}", Colors.YELLOW)
+            continue
+
+        summaries.append({
+            "file": name,
+            "summary": entry["summary"],
+            "timestamp": entry["timestamp"]
+        })
+
+    # Sólo sobreviven entradas de reportes que siguen existiendo
+    index["reports"] = fresh
     return summaries
 
-def generate_report() -> Dict[str, Any]:
-    """Genera el reporte consolidado"""
+def _fingerprint(exception: bytes, frames: List[Tuple[bytes, ...]]) -> str:
+    """Huella de un stack: tipo de excepción + frames sin números de línea ni rutas"""
+
+    exc_type = re.split(rb"[:\s]", exception.strip(), 1)[0]
+    h = hashlib.sha1(exc_type)
+    for frame in frames:
+        h.update(b"|" + b":".join(part or b"" for part in frame))
+    return h.hexdigest()[:12]
+
+def _new_histogram() -> Dict[str, Any]:
+    return {"buckets": [0] * (len(TIMING_BUCKETS_MS) + 1), "count": 0, "sum_ms": 0.0, "max_ms": 0.0}
+
+def digest_log(path: Path, size: int) -> Dict[str, Any]:
+    """
+    Recorre un log una vez vía mmap: líneas, errores, warnings, stacks (Python y JS)
+    agrupados por huella y tiempos en un histograma. Memoria acotada por MAX_FINGERPRINTS.
+    """
+
+    result = {"lines": 0, "errors": 0, "warnings": 0, "stacks": {}, "timings": _new_histogram()}
+    if size == 0:
+        return result
+
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, len(mm), LOG_READ_CHUNK):
+                result["lines"] += mm[offset:offset + LOG_READ_CHUNK].count(b"\n")
+            if mm[-1:] != b"\n":
+                result["lines"] += 1
+
+            result["errors"] = sum(1 for _ in _ERROR_LINE.finditer(mm))
+            result["warnings"] = sum(1 for _ in _WARN_LINE.finditer(mm))
+
+            stacks = result["stacks"]
+
+            def add_stack(exception: bytes, frames: List[Tuple[bytes, ...]]):
+                key = _fingerprint(exception, frames)
+                if key not in stacks and len(stacks) >= MAX_FINGERPRINTS:
+                    key = "other"
+                entry = stacks.setdefault(key, {
+                    "count": 0,
+                    "exception": exception.strip()[:SAMPLE_CHARS].decode("utf-8", "replace"),
+                })
+                entry["count"] += 1
+
+            for m in _PY_TRACE.finditer(mm):
+                add_stack(m.group(2), _PY_FRAME.findall(m.group(1)))
+            for m in _JS_TRACE.finditer(mm):
+                add_stack(m.group(1), _JS_FRAME.findall(m.group(2)))
+
+            hist = result["timings"]
+            for m in _TIMING.finditer(mm):
+                value = float(m.group(1)) * (1000.0 if m.group(2).lower() == b"s" else 1.0)
+                hist["buckets"][bisect.bisect_left(TIMING_BUCKETS_MS, value)] += 1
+                hist["count"] += 1
+                hist["sum_ms"] += value
+                hist["max_ms"] = max(hist["max_ms"], value)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+
+    return result
+
+def _histogram_quantile(hist: Dict[str, Any], q: float) -> Optional[float]:
+    """Cuantil aproximado: límite superior del bucket que lo contiene"""
+
+    if not hist["count"]:
+        return None
+    target = q * hist["count"]
+    seen = 0
+    for i, count in enumerate(hist["buckets"]):
+        seen += count
+        if seen >= target:
+            return float(TIMING_BUCKETS_MS[i]) if i < len(TIMING_BUCKETS_MS) else hist["max_ms"]
+    return hist["max_ms"]
+
+def load_log_summary(scan: Dict[str, Dict[str, Tuple[int, int]]], index: Dict[str, Any],
+                     jobs: int = 1) -> Dict[str, Any]:
+    """Digiere los logs que cambiaron (el resto sale del índice) y consolida un log_summary"""
+
+    cached = index.setdefault("logs", {})
+    names = sorted(scan["logs"])
+    stale = _stale(scan["logs"], cached)
+    digests = _parse_parallel(digest_log, [LOGS_DIR / name for name in stale],
+                              [scan["logs"][name][1] for name in stale], jobs)
+    for name, digest in zip(stale, digests):
+        mtime_ns, size = scan["logs"][name]
+        cached[name] = {"mtime_ns": mtime_ns, "size": size, "digest": digest}
+    index["logs"] = {name: cached[name] for name in names}
+
+    timings = _new_histogram()
+    stacks: Dict[str, Dict[str, Any]] = {}
+    by_file = {}
+    for name in names:
+        digest = cached[name]["digest"]
+        by_file[name] = {k: digest[k] for k in ("lines", "errors", "warnings")}
+        if "error" in digest:
+            by_file[name]["error"] = digest["error"]
+        for key, stack in digest["stacks"].items():
+            entry = stacks.setdefault(key, {"fingerprint": key, "count": 0,
+                                            "exception": stack["exception"], "files": []})
+            entry["count"] += stack["count"]
+            entry["files"].append(name)
+        hist = digest["timings"]
+        timings["buckets"] = [a + b for a, b in zip(timings["buckets"], hist["buckets"])]
+        timings["count"] += hist["count"]
+        timings["sum_ms"] += hist["sum_ms"]
+        timings["max_ms"] = max(timings["max_ms"], hist["max_ms"])
+
+    timings["le_ms"] = list(TIMING_BUCKETS_MS) + ["+Inf"]
+    timings["p50_ms"] = _histogram_quantile(timings, 0.50)
+    timings["p95_ms"] = _histogram_quantile(timings, 0.95)
+
+    return {
+        "files": len(names),
+        "bytes": sum(scan["logs"][name][1] for name in names),
+        "lines": sum(f["lines"] for f in by_file.values()),
+        "errors": sum(f["errors"] for f in by_file.values()),
+        "warnings": sum(f["warnings"] for f in by_file.values()),
+        "stack_traces": sorted(stacks.values(), key=lambda e: (-e["count"], e["fingerprint"])),
+        "timings_ms": timings,
+        "by_file": by_file,
+    }
+
+def catalog_screenshot(path: Path, size: int) -> Dict[str, Any]:
+    """Hash de contenido, miniatura WebP (si no existe ya para ese hash) y pHash de un PNG"""
+
+    try:
+        digest = _file_digest(path)
+    except OSError as e:
+        return {"error": str(e)}
+
+    entry = {"digest": digest, "thumb": None, "phash": None}
+    Image, imagehash = _imaging()
+    if Image is None:
+        return entry
+
+    thumb_path = THUMBS_DIR / f"{digest}-{THUMB_WIDTH}x{THUMB_MAX_HEIGHT}.webp"
+    try:
+        with Image.open(path) as img:
+            if imagehash is not None:
+                entry["phash"] = str(imagehash.phash(img))
+            if not thumb_path.exists():
+                # Recorte con la proporción de la miniatura: al reducir, el ancho queda en THUMB_WIDTH
+                width, height = img.size
+                top = img.crop((0, 0, width, min(height, width * THUMB_MAX_HEIGHT // THUMB_WIDTH)))
+                top.thumbnail((THUMB_WIDTH, THUMB_MAX_HEIGHT))
+                tmp_path = thumb_path.with_name(thumb_path.name + f".{os.getpid()}.tmp")
+                top.save(tmp_path, "WEBP", quality=THUMB_QUALITY)
+                os.replace(tmp_path, thumb_path)
+        entry["thumb"] = thumb_path.name
+    except (OSError, ValueError) as e:
+        entry["error"] = str(e)
+    return entry
+
+def _group_near_duplicates(hashes: Dict[str, int], max_distance: int = PHASH_DISTANCE) -> Dict[str, str]:
+    """
+    Agrupa pHashes a distancia de Hamming <= max_distance (union-find). Los candidatos salen
+    de partir el hash en max_distance + 1 bloques: dos hashes cercanos comparten al menos
+    un bloque (palomar), así que no se compara todo contra todo.
+    """
+
+    parent = {name: name for name in hashes}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    blocks = max_distance + 1
+    width = -(-64 // blocks)
+    for block in range(blocks):
+        buckets: Dict[int, List[str]] = {}
+        for name, value in hashes.items():
+            buckets.setdefault((value >> (block * width)) & ((1 << width) - 1), []).append(name)
+        for members in buckets.values():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if find(a) != find(b) and bin(hashes[a] ^ hashes[b]).count("1") <= max_distance:
+                        parent[max(find(a), find(b))] = min(find(a), find(b))
+
+    return {name: find(name) for name in hashes}
+
+def load_screenshot_catalog(scan: Dict[str, Dict[str, Tuple[int, int]]], index: Dict[str, Any],
+                            jobs: int = 1) -> Dict[str, Any]:
+    """
+    Miniaturas y grupos de screenshots casi iguales. Sólo se procesan los PNG nuevos o
+    modificados; las miniaturas que ya no usa ningún screenshot se borran.
+    """
+
+    Image, imagehash = _imaging()
+    pngs = {name: meta for name, meta in scan["docs"].items() if name.endswith(".png")}
+    cached = index.setdefault("screenshots", {})
+    stale = _stale(pngs, cached)
+
+    if stale and Image is not None:
+        THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+    entries = _parse_parallel(catalog_screenshot, [GENERATED_DOCS / name for name in stale],
+                              [pngs[name][1] for name in stale], jobs)
+    for name, entry in zip(stale, entries):
+        mtime_ns, size = pngs[name]
+        cached[name] = {"mtime_ns": mtime_ns, "size": size, **entry}
+    index["screenshots"] = catalog = {name: cached[name] for name in sorted(pngs)}
+
+    # Duplicados exactos por hash de contenido, mismo pHash y luego pHash cercano
+    by_digest: Dict[str, str] = {}
+    by_phash: Dict[int, str] = {}
+    root = {}
+    for name, entry in catalog.items():
+        root[name] = by_digest.setdefault(entry.get("digest", name), name)
+        if entry.get("phash"):
+            root[name] = by_phash.setdefault(int(entry["phash"], 16), root[name])
+    near = _group_near_duplicates({name: value for value, name in by_phash.items()})
+
+    groups: Dict[str, List[str]] = {}
+    for name in catalog:
+        groups.setdefault(near.get(root[name], root[name]), []).append(name)
+
+    if THUMBS_DIR.exists():
+        used = {entry.get("thumb") for entry in catalog.values()}
+        with os.scandir(THUMBS_DIR) as it:
+            for thumb in it:
+                if thumb.name not in used:
+                    os.unlink(thumb.path)
+
+    thumbs_prefix = THUMBS_DIR.relative_to(GENERATED_DOCS).as_posix() + "/"
+    return {
+        "thumbnails": Image is not None,
+        "perceptual_hash": imagehash is not None,
+        "unique": len(groups),
+        "groups": [
+            {
+                "representative": members[0],
+                "thumb": thumbs_prefix + catalog[members[0]]["thumb"] if catalog[members[0]].get("thumb") else None,
+                "members": members,
+            }
+            for _, members in sorted(groups.items())
+        ],
+    }
+
+def git_info() -> Tuple[str, str]:
+    """Branch y commit corto con una sola invocación de git"""
+
+    try:
+        out = subprocess.check_output(
+            ["git", "log", "-1", "--format=%h%n%D", "HEAD"],
+            cwd=PROJECT_ROOT,
+            text=True,
+            stderr=subprocess.DEVNULL
+        )
+    except Exception:
+        return "unknown", "unknown"
+
+    commit, _, refs = out.strip().partition("\n")
+    # %D: "HEAD -> main, origin/main" o "HEAD, ..." si está desacoplado
+    branch = "HEAD"
+    for ref in refs.split(", "):
+        if ref.startswith("HEAD -> "):
+            branch = ref[len("HEAD -> "):]
+            break
+    return branch, commit or "unknown"
+
+def flatten_numeric(data: Any, prefix: str = "") -> Dict[str, float]:
+    """Aplana los valores numéricos de un summary anidado a claves con puntos"""
+
+    flat = {}
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        items = ()
+
+    for key, value in items:
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            flat[name] = value
+        elif isinstance(value, (dict, list)):
+            flat.update(flatten_numeric(value, name))
+
+    return flat
+
+def append_history(report: Dict[str, Any], metrics: Dict[str, Dict[str, float]]):
+    """Agrega una fila al historial (nunca reescribe filas anteriores)"""
+
+    row = {
+        "timestamp": report["timestamp"],
+        "branch": report["branch"],
+        "commit": report["commit"],
+        "metrics": metrics,
+    }
+    GENERATED_DOCS.mkdir(parents=True, exist_ok=True)
+    with open(HISTORY_PATH, 'a') as f:
+        f.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+def load_history(branch: str, exclude_commit: Optional[str] = None,
+                 limit: int = BASELINE_COMMITS) -> "OrderedDict[str, Dict[str, Dict[str, float]]]":
+    """
+    Últimos `limit` commits del branch en el historial (commit -> métricas).
+    Si un commit tiene varias ejecuciones, gana la más reciente.
+    """
+
+    commits: "OrderedDict[str, Dict[str, Dict[str, float]]]" = OrderedDict()
+    if not HISTORY_PATH.exists():
+        return commits
+
+    with open(HISTORY_PATH, 'r') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("branch") != branch or row.get("commit") == exclude_commit:
+                continue
+            commits.pop(row["commit"], None)
+            commits[row["commit"]] = row.get("metrics", {})
+            # Memoria acotada a la ventana pedida
+            while len(commits) > limit:
+                commits.popitem(last=False)
+
+    return commits
+
+def metric_direction(name: str) -> int:
+    """+1 si subir empeora, -1 si bajar empeora, 0 si no se sabe (por palabras del nombre)"""
+
+    leaf = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name.rsplit(".", 1)[-1]).lower()
+    words = re.findall(r"[a-z]+", leaf)
+    if any(word.startswith(WORSE_WHEN_HIGHER) for word in words):
+        return 1
+    if any(word.startswith(WORSE_WHEN_LOWER) for word in words):
+        return -1
+    return 0
+
+def rolling_baselines(baseline: "OrderedDict[str, Dict[str, Dict[str, float]]]") -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Mediana por métrica sobre los commits de referencia (y en cuántos aparece)"""
+
+    values: Dict[Tuple[str, str], List[float]] = {}
+    for metrics in baseline.values():
+        for report_file, fields in metrics.items():
+            for name, value in fields.items():
+                values.setdefault((report_file, name), []).append(value)
+
+    baselines: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (report_file, name), history in sorted(values.items()):
+        baselines.setdefault(report_file, {})[name] = {
+            "median": statistics.median(history),
+            "commits": len(history),
+        }
+    return baselines
+
+def detect_regressions(current: Dict[str, Dict[str, float]],
+                       baseline: "OrderedDict[str, Dict[str, Dict[str, float]]]",
+                       threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compara cada métrica contra la mediana de los commits de referencia.
+    Regresión: cambio relativo > threshold en la dirección que empeora
+    (en ambas direcciones si la métrica no tiene dirección conocida).
+    """
+
+    baselines = rolling_baselines(baseline)
+    regressions = []
+    for report_file, metrics in sorted(current.items()):
+        for name, value in sorted(metrics.items()):
+            ref = baselines.get(report_file, {}).get(name)
+            if ref is None or ref["median"] == value:
+                continue
+
+            base = ref["median"]
+            # Con base 0 el cambio relativo es infinito, con el signo de la variación
+            change = (value - base) / abs(base) if base else math.copysign(math.inf, value)
+            direction = metric_direction(name)
+            worse = change * direction if direction else abs(change)
+            if worse > threshold:
+                regressions.append({
+                    "report": report_file,
+                    "metric": name,
+                    "value": value,
+                    "baseline": base,
+                    "change": round(change, 4) if base else None,
+                    "commits": ref["commits"],
+                })
+
+    return regressions
+
+def _metric_name(*parts: str) -> str:
+    """Nombre OpenMetrics válido: snake_case, sólo [a-zA-Z0-9_]"""
+
+    name = "_".join(re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", part) for part in parts)
+    name = re.sub(r"[^a-zA-Z0-9_]+", "_", name).strip("_").lower()
+    return name if not name[:1].isdigit() else "_" + name
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _atomic_write(path: Path, lines: List[str]):
+    """El scraper puede leer en cualquier momento: escribir a .tmp y reemplazar"""
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, path)
+
+def export_metrics(report: Dict[str, Any], metrics: Dict[str, Dict[str, float]],
+                   directory: Path = METRICS_DIR) -> Tuple[Path, Path]:
+    """
+    Exporta las métricas numéricas ya aplanadas de los summaries (más las de log_summary)
+    como OpenMetrics (gauges con labels branch/commit/report) y como JSON Lines.
+    """
+
+    samples: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    base_labels = {"branch": report["branch"], "commit": report["commit"]}
+
+    for report_file, fields in sorted(metrics.items()):
+        stem = report_file[:-len("-report.json")] if report_file.endswith("-report.json") else report_file
+        for field, value in sorted(fields.items()):
+            name = _metric_name(METRICS_PREFIX, "report", field)
+            samples.setdefault(name, []).append(({**base_labels, "report": stem}, value))
+
+    log_summary = report.get("log_summary")
+    if log_summary:
+        for field in ("files", "bytes", "lines", "errors", "warnings"):
+            samples.setdefault(_metric_name(METRICS_PREFIX, "logs", field), []).append(
+                (base_labels, log_summary[field]))
+
+    directory.mkdir(parents=True, exist_ok=True)
+    prom_path = directory / "POST_TASK_METRICS.prom"
+    jsonl_path = directory / "POST_TASK_METRICS.jsonl"
+
+    prom_lines = []
+    jsonl_lines = []
+    for name, values in samples.items():
+        prom_lines.append(f"# TYPE {name} gauge\n")
+        for labels, value in values:
+            rendered = ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items())
+            prom_lines.append(f"{name}{{{rendered}}} {value}\n")
+            jsonl_lines.append(json.dumps({
+                "metric": name,
+                "value": value,
+                "timestamp": report["timestamp"],
+                **labels,
+            }, separators=(",", ":")) + "\n")
+    prom_lines.append("# EOF\n")
+
+    _atomic_write(prom_path, prom_lines)
+    _atomic_write(jsonl_path, jsonl_lines)
+    return prom_path, jsonl_path
+
+def generate_report(jobs: int = 1, baseline_commits: int = BASELINE_COMMITS,
+                    threshold: float = REGRESSION_THRESHOLD,
+                    section_limit: int = SECTION_LIMIT,
+                    retain: Optional[int] = None,
+                    dry_run: bool = False,
+                    metrics_dir: Path = METRICS_DIR,
+                    scan: Optional[Dict[str, Dict[str, Tuple[int, int]]]] = None,
+                    index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Genera el reporte consolidado. En modo --watch se pasan el scan y el índice que el
+    daemon mantiene en memoria, así sólo se re-procesan las entradas que cambiaron.
+    """
 
     log("🐍 AutaMedica - Python Post Task Report", Colors.CYAN)
     log("=" * 60, Colors.CYAN)
@@ -97,27 +1036,28 @@ def generate_report() -> Dict[str, Any]:
     timestamp = datetime.datetime.utcnow().isoformat() + "Z"
 
     # Branch y commit info (si está disponible)
-    branch = "unknown"
-    commit = "unknown"
+    branch, commit = git_info()
 
-    try:
-        import subprocess
-        branch = subprocess.check_output(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=PROJECT_ROOT,
-            text=True
-        ).strip()
-        commit = subprocess.check_output(
-            ["git", "rev-parse", "--short", "HEAD"],
-            cwd=PROJECT_ROOT,
-            text=True
-        ).strip()
-    except Exception:
-        pass
+    # Retención antes de recolectar, para que el reporte refleje lo que queda
+    retention = None
+    if retain is not None:
+        mode = " (dry-run)" if dry_run else ""
+        log(f"\n🧹 Retención: últimos {retain} runs por tipo{mode}...", Colors.CYAN)
+        retention = apply_retention(retain, dry_run)
+        verb = "Se liberarían" if dry_run else "Liberados"
+        log(f"   Borrados: {retention['deleted']}, comprimidos: {retention['compressed']}, "
+            f"hardlinks: {retention['linked']}", Colors.GREEN)
+        log(f"   {verb}: {retention['bytes_reclaimed'] / 1024 / 1024:.1f} MB"
+            + (f" (+ compresión de {retention['bytes_to_compress'] / 1024 / 1024:.1f} MB de logs)"
+               if dry_run and retention['bytes_to_compress'] else ""), Colors.GREEN)
 
-    # Recolectar artefactos
+    # Recolectar artefactos (un único stat por directorio)
     log("\n📦 Recolectando artefactos...", Colors.CYAN)
-    artifacts = collect_artifacts()
+    if scan is None:
+        scan = scan_artifacts()
+    if index is None:
+        index = load_index()
+    artifacts = collect_artifacts(scan)
 
     log(f"   Docs: {len(artifacts['docs'])}", Colors.GREEN)
     log(f"   Logs: {len(artifacts['logs'])}", Colors.GREEN)
@@ -126,11 +1066,29 @@ def generate_report() -> Dict[str, Any]:
 
     # Cargar resúmenes de reportes
     log("\n📊 Cargando resúmenes de reportes...", Colors.CYAN)
-    report_summaries = load_report_summaries()
+    report_summaries = load_report_summaries(scan, index, jobs)
 
     for summary in report_summaries:
         log(f"   ✅ {summary['file']}: {summary['summary']}", Colors.GREEN)
 
+    # Digerir logs (sólo los que cambiaron desde la última ejecución)
+    log("\n🔎 Analizando logs...", Colors.CYAN)
+    log_summary = load_log_summary(scan, index, jobs)
+
+    log(f"   Líneas: {log_summary['lines']}, errores: {log_summary['errors']}, "
+        f"warnings: {log_summary['warnings']}, stacks distintos: {len(log_summary['stack_traces'])}",
+        Colors.YELLOW if log_summary['errors'] else Colors.GREEN)
+
+    # Miniaturas y agrupación de screenshots (sólo los nuevos se procesan)
+    log("\n🖼️  Catalogando screenshots...", Colors.CYAN)
+    screenshot_catalog = load_screenshot_catalog(scan, index, jobs)
+    save_index(index)
+
+    if not screenshot_catalog["thumbnails"]:
+        log("   ⚠️  Pillow no está instalado: sin miniaturas", Colors.YELLOW)
+    log(f"   Screenshots distintos: {screenshot_catalog['unique']} de {len(artifacts['screenshots'])}",
+        Colors.GREEN)
+
     # Generar reporte consolidado
     report = {
         "timestamp": timestamp,
@@ -138,8 +1096,26 @@ def generate_report() -> Dict[str, Any]:
         "commit": commit,
         "artifacts": artifacts,
         "report_summaries": report_summaries,
+        "log_summary": log_summary,
+        "screenshot_catalog": screenshot_catalog,
         "note": "Post-task verification completed by Python agent."
     }
+    if retention is not None:
+        report["retention"] = {**retention, "keep": retain, "dry_run": dry_run}
+
+    # Regresiones contra los últimos commits del mismo branch, luego registrar esta ejecución
+    baseline = load_history(branch, exclude_commit=commit, limit=baseline_commits)
+    current = {summary["file"]: flatten_numeric(summary["summary"]) for summary in report_summaries}
+    report["regressions"] = detect_regressions(current, baseline, threshold)
+    append_history(report, current)
+    prom_path, jsonl_path = export_metrics(report, current, metrics_dir)
+
+    if report["regressions"]:
+        log(f"\n📉 Regresiones vs. últimos {len(baseline)} commits de {branch}:", Colors.YELLOW)
+        for r in report["regressions"]:
+            change = f"{r['change']:+.1%}" if r["change"] is not None else "desde 0"
+            log(f"   ⚠️  {r['report']} {r['metric']}: {r['value']} (base {r['baseline']}, {change})",
+                Colors.YELLOW)
 
     # Guardar reporte
     report_path = GENERATED_DOCS / "POST_TASK_REPORT.json"
@@ -150,85 +1126,561 @@ def generate_report() -> Dict[str, Any]:
 
     log(f"\n📄 Reporte guardado en: {report_path.relative_to(PROJECT_ROOT)}", Colors.CYAN)
 
-    # Generar también versión Markdown
-    markdown_report = generate_markdown_report(report)
+    # Generar también versiones Markdown y HTML, escritas en streaming
     markdown_path = GENERATED_DOCS / "POST_TASK_REPORT.md"
-
     with open(markdown_path, 'w') as f:
-        f.write(markdown_report)
+        write_markdown_report(report, f, section_limit)
 
     log(f"📄 Reporte Markdown: {markdown_path.relative_to(PROJECT_ROOT)}", Colors.CYAN)
 
+    html_path = GENERATED_DOCS / "POST_TASK_REPORT.html"
+    with open(html_path, 'w') as f:
+        write_html_report(report, f, section_limit)
+
+    log(f"📄 Reporte HTML: {html_path.relative_to(PROJECT_ROOT)}", Colors.CYAN)
+    log(f"📈 Métricas: {prom_path} (+ {jsonl_path.name})", Colors.CYAN)
+
     return report
 
-def generate_markdown_report(report: Dict[str, Any]) -> str:
-    """Genera versión Markdown del reporte"""
+def _artifact_sections(report: Dict[str, Any]) -> List[Tuple[str, List[str]]]:
+    artifacts = report['artifacts']
+    return [
+        ("Documentos", artifacts['docs']),
+        ("Logs", artifacts['logs']),
+        ("Screenshots", artifacts['screenshots']),
+        ("Reportes JSON", artifacts['reports']),
+    ]
 
-    md = f"""# Post Task Report - AutaMedica Agentic OS
+def _limited(items: List[Any], limit: int) -> Tuple[List[Any], int]:
+    """Primeros `limit` elementos (0 = todos) y cuántos quedaron afuera"""
 
-**Fecha**: {report['timestamp']}
-**Branch**: {report['branch']}
-**Commit**: {report['commit']}
+    if limit <= 0 or len(items) <= limit:
+        return items, 0
+    return items[:limit], len(items) - limit
 
-## Artefactos Generados
+def _summary_text(summary: Any, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """JSON indentado del resumen, recortado a max_chars (0 = sin recorte)"""
+    text = json.dumps(summary, indent=2)
+    if max_chars > 0 and len(text) > max_chars:
+        text = text[:max_chars] + f"\n… ({len(text) - max_chars} caracteres más)"
+    return text
 
-### Documentos ({len(report['artifacts']['docs'])})
-"""
+def _similar_names(group: Dict[str, Any], shown: int = 5) -> Tuple[List[str], int]:
+    others = group['members'][1:]
+    return others[:shown], max(0, len(others) - shown)
 
-    for doc in report['artifacts']['docs']:
-        md += f"- `{doc}`\n"
+def _markdown_screenshot_group(group: Dict[str, Any]) -> str:
+    """Miniatura enlazada al original (rutas relativas a generated-docs) + casi-duplicados"""
 
-    md += f"""
-### Logs ({len(report['artifacts']['logs'])})
-"""
+    name = group['representative']
+    line = f"- [![{name}]({group['thumb']})]({name}) " if group['thumb'] else "- "
+    line += f"`{DOCS_PREFIX}{name}`"
+    others, more = _similar_names(group)
+    if others:
+        line += f" (+{len(group['members']) - 1} similares: " + ", ".join(f"`{n}`" for n in others)
+        line += f", … y {more} más)" if more else ")"
+    return line + "\n"
 
-    for log_file in report['artifacts']['logs']:
-        md += f"- `{log_file}`\n"
+def _html_screenshot_group(group: Dict[str, Any]) -> str:
+    esc = html.escape
+    name = group['representative']
+    line = "<li>"
+    if group['thumb']:
+        line += (f'<a href="{esc(name)}"><img src="{esc(group["thumb"])}" alt="{esc(name)}" '
+                 f'loading="lazy"></a><br>')
+    line += f"<code>{esc(DOCS_PREFIX + name)}</code>"
+    others, more = _similar_names(group)
+    if others:
+        line += (f' <span class="more">+{len(group["members"]) - 1} similares: '
+                 + ", ".join(esc(n) for n in others) + (f", … y {more} más" if more else "") + "</span>")
+    return line + "</li>\n"
 
-    md += f"""
-### Screenshots ({len(report['artifacts']['screenshots'])})
-"""
+def write_markdown_report(report: Dict[str, Any], f: TextIO, limit: int = SECTION_LIMIT):
+    """Escribe el reporte Markdown sección por sección directamente en `f`"""
 
-    for screenshot in report['artifacts']['screenshots']:
-        md += f"- `{screenshot}`\n"
+    f.write(f"""# Post Task Report - AutaMedica Agentic OS
 
-    md += f"""
-### Reportes JSON ({len(report['artifacts']['reports'])})
-"""
+**Fecha**: {report['timestamp']}
+**Branch**: {report['branch']}
+**Commit**: {report['commit']}
+
+## Artefactos Generados
+""")
 
-    for report_file in report['artifacts']['reports']:
-        md += f"- `{report_file}`\n"
+    catalog = report.get('screenshot_catalog')
+    for title, items in _artifact_sections(report):
+        if items is report['artifacts']['screenshots'] and catalog:
+            f.write(f"\n### {title} ({len(items)}, {catalog['unique']} distintos)\n")
+            items = catalog['groups']
+        else:
+            f.write(f"\n### {title} ({len(items)})\n")
+        shown, hidden = _limited(items, limit)
+        for item in shown:
+            if isinstance(item, dict):
+                f.write(_markdown_screenshot_group(item))
+            else:
+                f.write(f"- `{item}`\n")
+        if hidden:
+            f.write(f"- … y {hidden} más\n")
 
-    md += """
-## Resúmenes de Checks
+    if report.get('regressions'):
+        f.write("\n## Regresiones\n\n")
+        for r in report['regressions']:
+            change = f"{r['change']:+.1%}" if r['change'] is not None else "desde 0"
+            f.write(f"- `{r['report']}` **{r['metric']}**: {r['value']} (base {r['baseline']}, {change})\n")
 
-"""
+    log_summary = report.get('log_summary')
+    if log_summary and log_summary['files']:
+        timings = log_summary['timings_ms']
+        f.write(f"\n## Logs\n\n"
+                f"- Archivos: {log_summary['files']} ({log_summary['bytes'] / 1024 / 1024:.1f} MB, "
+                f"{log_summary['lines']} líneas)\n"
+                f"- Errores: {log_summary['errors']}, warnings: {log_summary['warnings']}\n")
+        if timings['count']:
+            f.write(f"- Tiempos: {timings['count']} mediciones, p50 ≤ {timings['p50_ms']:g} ms, "
+                    f"p95 ≤ {timings['p95_ms']:g} ms, máx {timings['max_ms']:g} ms\n")
+        shown, hidden = _limited(log_summary['stack_traces'], limit)
+        if shown:
+            f.write("\n| Stack | Veces | Excepción |\n|---|---|---|\n")
+            for stack in shown:
+                exception = stack['exception'].replace('|', '\\|')
+                f.write(f"| `{stack['fingerprint']}` | {stack['count']} | {exception} |\n")
+            if hidden:
+                f.write(f"\n*… y {hidden} stacks más*\n")
 
-    for summary in report['report_summaries']:
-        md += f"### {summary['file']}\n\n"
-        md += f"```json\n{json.dumps(summary['summary'], indent=2)}\n```\n\n"
+    f.write("\n## Resúmenes de Checks\n\n")
+    shown, hidden = _limited(report['report_summaries'], limit)
+    # Sin límite (formato original) los resúmenes tampoco se recortan
+    max_chars = SUMMARY_MAX_CHARS if limit else 0
+    for summary in shown:
+        f.write(f"### {summary['file']}\n\n")
+        f.write(f"```json\n{_summary_text(summary['summary'], max_chars)}\n```\n\n")
+    if hidden:
+        f.write(f"*… y {hidden} resúmenes más en POST_TASK_REPORT.json*\n\n")
 
-    md += f"""
+    f.write(f"""
 ## Nota
 
 {report['note']}
 
 ---
 *Generado automáticamente por el sistema Agentic OS*
-"""
+""")
+
+def generate_markdown_report(report: Dict[str, Any], limit: int = 0) -> str:
+    """Genera versión Markdown del reporte"""
+
+    buf = io.StringIO()
+    write_markdown_report(report, buf, limit)
+    return buf.getvalue()
+
+def write_html_report(report: Dict[str, Any], f: TextIO, limit: int = SECTION_LIMIT):
+    """Versión HTML con secciones colapsables (<details>), escrita de forma incremental"""
+
+    esc = html.escape
+    f.write(f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Post Task Report - {esc(report['commit'])}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; margin: 2rem; max-width: 72rem; }}
+summary {{ cursor: pointer; font-weight: 600; }}
+pre {{ background: #f6f8fa; padding: .75rem; overflow-x: auto; }}
+.more {{ color: #6a737d; font-style: italic; }}
+.regression {{ color: #b31d28; }}
+img {{ max-width: 320px; border: 1px solid #d0d7de; }}
+</style>
+</head>
+<body>
+<h1>Post Task Report - AutaMedica Agentic OS</h1>
+<p><strong>Fecha</strong>: {esc(report['timestamp'])}<br>
+<strong>Branch</strong>: {esc(report['branch'])}<br>
+<strong>Commit</strong>: {esc(report['commit'])}</p>
+<h2>Artefactos Generados</h2>
+""")
+
+    catalog = report.get('screenshot_catalog')
+    for title, items in _artifact_sections(report):
+        count = f"{len(items)}"
+        if items is report['artifacts']['screenshots'] and catalog:
+            count += f", {catalog['unique']} distintos"
+            items = catalog['groups']
+        shown, hidden = _limited(items, limit)
+        f.write(f"<details><summary>{esc(title)} ({count})</summary>\n<ul>\n")
+        for item in shown:
+            if isinstance(item, dict):
+                f.write(_html_screenshot_group(item))
+            else:
+                f.write(f"<li><code>{esc(item)}</code></li>\n")
+        if hidden:
+            f.write(f'<li class="more">… y {hidden} más</li>\n')
+        f.write("</ul></details>\n")
+
+    if report.get('regressions'):
+        f.write('<h2>Regresiones</h2>\n<ul class="regression">\n')
+        for r in report['regressions']:
+            change = f"{r['change']:+.1%}" if r['change'] is not None else "desde 0"
+            f.write(f"<li><code>{esc(r['report'])}</code> <strong>{esc(r['metric'])}</strong>: "
+                    f"{r['value']} (base {r['baseline']}, {change})</li>\n")
+        f.write("</ul>\n")
+
+    log_summary = report.get('log_summary')
+    if log_summary and log_summary['files']:
+        timings = log_summary['timings_ms']
+        f.write(f"<h2>Logs</h2>\n<p>Archivos: {log_summary['files']} "
+                f"({log_summary['bytes'] / 1024 / 1024:.1f} MB, {log_summary['lines']} líneas)<br>\n"
+                f"Errores: {log_summary['errors']}, warnings: {log_summary['warnings']}")
+        if timings['count']:
+            f.write(f"<br>\nTiempos: {timings['count']} mediciones, p50 ≤ {timings['p50_ms']:g} ms, "
+                    f"p95 ≤ {timings['p95_ms']:g} ms, máx {timings['max_ms']:g} ms")
+        f.write("</p>\n")
+        shown, hidden = _limited(log_summary['stack_traces'], limit)
+        if shown:
+            f.write(f"<details><summary>Stacks ({len(log_summary['stack_traces'])})</summary>\n"
+                    "<table><tr><th>Stack</th><th>Veces</th><th>Excepción</th></tr>\n")
+            for stack in shown:
+                f.write(f"<tr><td><code>{esc(stack['fingerprint'])}</code></td><td>{stack['count']}</td>"
+                        f"<td>{esc(stack['exception'])}</td></tr>\n")
+            f.write("</table>\n")
+            if hidden:
+                f.write(f'<p class="more">… y {hidden} stacks más</p>\n')
+            f.write("</details>\n")
+
+    f.write(f"<h2>Resúmenes de Checks ({len(report['report_summaries'])})</h2>\n")
+    shown, hidden = _limited(report['report_summaries'], limit)
+    max_chars = SUMMARY_MAX_CHARS if limit else 0
+    for summary in shown:
+        f.write(f"<details><summary>{esc(summary['file'])}</summary>\n"
+                f"<pre>{esc(_summary_text(summary['summary'], max_chars))}</pre></details>\n")
+    if hidden:
+        f.write(f'<p class="more">… y {hidden} resúmenes más en POST_TASK_REPORT.json</p>\n')
+
+    f.write(f"""<h2>Nota</h2>
+<p>{esc(report['note'])}</p>
+<hr>
+<p><em>Generado automáticamente por el sistema Agentic OS</em></p>
+</body>
+</html>
+""")
+
+class InotifyWatcher:
+    """inotify vía ctypes (sin dependencias); devuelve (directorio, nombre) cambiados"""
+
+    def __init__(self, directories: List[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, str(directory).encode(), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+            self.dirs[wd] = directory
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read_changes(self) -> Optional[set]:
+        """Cambios pendientes; None si el kernel descartó eventos (hay que re-escanear)"""
+
+        changes = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changes
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = struct.unpack_from("iIII", buf, offset)
+                name = buf[offset + 16:offset + 16 + length].rstrip(b"\0").decode(errors="replace")
+                offset += 16 + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if name and wd in self.dirs:
+                    changes.add((self.dirs[wd], name))
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Alternativa sin inotify: compara un scandir cada POLL_INTERVAL segundos"""
+
+    def __init__(self, directories: List[Path]):
+        self.snapshots = {directory: _scan_dir(directory) for directory in directories}
+
+    def fileno(self) -> Optional[int]:
+        return None
+
+    def read_changes(self) -> Optional[set]:
+        changes = set()
+        for directory, before in self.snapshots.items():
+            after = _scan_dir(directory)
+            changes.update((directory, name) for name in before.keys() ^ after.keys())
+            changes.update((directory, name) for name in before.keys() & after.keys()
+                           if before[name] != after[name])
+            self.snapshots[directory] = after
+        return changes
+
+    def close(self):
+        pass
+
+def _apply_change(scan: Dict[str, Dict[str, Tuple[int, int]]], directory: Path, name: str) -> bool:
+    """Actualiza una entrada del scan en memoria; True si afecta al reporte"""
+
+    if directory == LOGS_DIR:
+        key = "logs"
+        if not name.endswith(".log"):
+            return False
+    else:
+        key = "docs"
+        if name in (INDEX_PATH.name, HISTORY_PATH.name) or name.endswith(".tmp"):
+            return False
+
+    try:
+        st = os.stat(directory / name)
+        if not os.path.isfile(directory / name):
+            raise FileNotFoundError(name)
+        scan[key][name] = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        scan[key].pop(name, None)
+    return name not in OWN_OUTPUTS
+
+def _socket_in_use() -> bool:
+    """True si ya hay un daemon escuchando en SOCKET_PATH (y no un socket huérfano)"""
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(1.0)
+            client.connect(str(SOCKET_PATH))
+        return True
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+
+def _regenerate(report_args: Dict[str, Any], scan, index) -> Optional[str]:
+    """Regenera el reporte dentro del daemon; un error se registra sin tirar el proceso"""
+
+    try:
+        generate_report(**report_args, scan=scan, index=index)
+        return None
+    except Exception as e:
+        log(f"❌ Error generando reporte: {e}", Colors.RED)
+        import traceback
+        traceback.print_exc()
+        return str(e)
+
+def watch(report_args: Dict[str, Any], debounce: float = WATCH_DEBOUNCE) -> int:
+    """
+    Daemon: mantiene scan + índice en memoria, escucha inotify (o hace polling) sobre
+    generated-docs y .logs, y regenera el reporte sólo con lo que cambió: tras `debounce`
+    segundos sin cambios o cuando un cliente `--flush` lo pide por el socket unix.
+    Devuelve el código de salida (1 si ya hay otro daemon corriendo).
+    """
+
+    if _socket_in_use():
+        log(f"❌ Ya hay un daemon --watch escuchando en {SOCKET_PATH.relative_to(PROJECT_ROOT)}", Colors.RED)
+        return 1
+
+    GENERATED_DOCS.mkdir(parents=True, exist_ok=True)
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        watcher = InotifyWatcher([GENERATED_DOCS, LOGS_DIR])
+        log("👀 Watch con inotify", Colors.CYAN)
+    except (OSError, AttributeError) as e:
+        watcher = PollingWatcher([GENERATED_DOCS, LOGS_DIR])
+        log(f"👀 Watch con polling cada {POLL_INTERVAL:g}s (inotify no disponible: {e})", Colors.YELLOW)
+
+    # Socket huérfano de un daemon que murió sin limpiar (ya se comprobó que nadie escucha).
+    # Se escucha antes de la primera pasada para que otro --watch lo vea ocupado desde ya
+    if SOCKET_PATH.exists():
+        SOCKET_PATH.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(SOCKET_PATH))
+    server.listen()
+    server.setblocking(False)
+
+    scan = scan_artifacts()
+    index = load_index()
+    _regenerate(report_args, scan, index)
+    # La retención sólo corre en la primera pasada
+    report_args = {**report_args, "retain": None}
+
+    sel = selectors.DefaultSelector()
+    sel.register(server, selectors.EVENT_READ, "client")
+    if watcher.fileno() is not None:
+        sel.register(watcher.fileno(), selectors.EVENT_READ, "fs")
+    log(f"🔌 Esperando cambios; `--flush` vía {SOCKET_PATH.relative_to(PROJECT_ROOT)}", Colors.CYAN)
+
+    dirty = 0
+    last_change = 0.0
+
+    def flush() -> Dict[str, Any]:
+        nonlocal dirty
+        start = time.perf_counter()
+        changed = dirty
+        error = None
+        if dirty:
+            # Aun si falla se limpia dirty: el próximo cambio vuelve a intentarlo
+            error = _regenerate(report_args, scan, index)
+            dirty = 0
+        result = {"ok": error is None, "changed": changed, "ms": round((time.perf_counter() - start) * 1000, 1)}
+        if error is not None:
+            result["error"] = error
+        return result
+
+    try:
+        while True:
+            if dirty:
+                timeout = max(0.0, last_change + debounce - time.monotonic())
+            else:
+                timeout = None
+            if watcher.fileno() is None:
+                timeout = POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL)
+
+            events = sel.select(timeout)
+            if watcher.fileno() is None or any(key.data == "fs" for key, _ in events):
+                changes = watcher.read_changes()
+                if changes is None:
+                    log("⚠️  Cola de inotify desbordada: re-escaneo completo", Colors.YELLOW)
+                    scan.clear()
+                    scan.update(scan_artifacts())
+                    dirty += 1
+                    last_change = time.monotonic()
+                else:
+                    relevant = sum(_apply_change(scan, directory, name) for directory, name in changes)
+                    if relevant:
+                        dirty += relevant
+                        last_change = time.monotonic()
+
+            for key, _ in events:
+                if key.data != "client":
+                    continue
+                conn, _ = server.accept()
+                with conn:
+                    conn.settimeout(5)
+                    command = b""
+                    try:
+                        command = conn.recv(64).strip()
+                        # Conexión vacía: otro --watch comprobando si el daemon está vivo
+                        if not command:
+                            continue
+                        result = flush() if command == b"flush" else {"ok": command == b"stop"}
+                        conn.sendall((json.dumps(result) + "\n").encode())
+                    except OSError as e:
+                        log(f"⚠️  Cliente del socket desconectado: {e}", Colors.YELLOW)
+                if command == b"stop":
+                    return 0
+
+            if dirty and time.monotonic() - last_change >= debounce:
+                flush()
+    finally:
+        sel.close()
+        server.close()
+        watcher.close()
+        if SOCKET_PATH.exists():
+            SOCKET_PATH.unlink()
 
-    return md
+def send_command(command: str, timeout: float = 300.0) -> Optional[Dict[str, Any]]:
+    """Cliente del daemon; None si no hay ninguno escuchando"""
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(SOCKET_PATH))
+            client.sendall(command.encode() + b"\n")
+            return json.loads(client.makefile().readline())
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reporte consolidado post-tarea")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Procesos para parsear reportes en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--baseline-commits", type=int, default=BASELINE_COMMITS,
+                        help="Commits previos del mismo branch usados como referencia")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Cambio relativo que cuenta como regresión (0.1 = 10%%)")
+    parser.add_argument("--section-limit", type=int, default=SECTION_LIMIT,
+                        help="Máximo de elementos por sección en Markdown/HTML (0 = sin límite)")
+    parser.add_argument("--retain", type=int, metavar="N",
+                        help="Conservar sólo los últimos N runs por tipo de artefacto (comprime logs y deduplica PNGs)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Con --retain: mostrar qué se borraría/comprimiría sin tocar archivos")
+    parser.add_argument("--metrics-dir", type=Path, default=METRICS_DIR,
+                        help="Dónde escribir POST_TASK_METRICS.prom/.jsonl para el scraper")
+    parser.add_argument("--watch", action="store_true",
+                        help="Daemon: regenerar incrementalmente ante cambios en generated-docs y .logs")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help="Con --watch: segundos sin cambios antes de regenerar solo")
+    parser.add_argument("--flush", action="store_true",
+                        help="Pedir al daemon --watch que regenere ya (si no hay daemon, corre completo)")
+    parser.add_argument("--stop", action="store_true", help="Detener el daemon --watch")
+    parser.add_argument("--baselines", action="store_true",
+                        help="Sólo mostrar las medianas de referencia del branch actual (JSON) y salir")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Salir con código 2 si hay regresiones (para CI)")
+    args = parser.parse_args(argv)
+    if args.retain is not None and args.retain < 1:
+        parser.error("--retain debe ser >= 1")
+    return args
 
 def main():
     """Punto de entrada principal"""
 
+    args = parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if args.baselines:
+        branch, _ = git_info()
+        baseline = load_history(branch, limit=args.baseline_commits)
+        print(json.dumps({
+            "branch": branch,
+            "commits": list(baseline),
+            "baselines": rolling_baselines(baseline),
+        }, indent=2))
+        return 0
+
+    if args.flush or args.stop:
+        result = send_command("flush" if args.flush else "stop")
+        if result is not None:
+            if not result.get("ok"):
+                log(f"❌ Daemon: {result.get('error', result)}", Colors.RED)
+                return 1
+            log(f"✅ Daemon: {result}", Colors.GREEN)
+            return 0
+        if args.stop:
+            log("⚠️  No hay daemon --watch corriendo", Colors.YELLOW)
+            return 1
+        log("⚠️  No hay daemon --watch; generando el reporte completo", Colors.YELLOW)
+
+    report_args = {
+        "jobs": jobs,
+        "baseline_commits": args.baseline_commits,
+        "threshold": args.threshold,
+        "section_limit": args.section_limit,
+        "retain": args.retain,
+        "dry_run": args.dry_run,
+        "metrics_dir": args.metrics_dir,
+    }
+
+    if args.watch:
+        try:
+            return watch(report_args, args.debounce)
+        except KeyboardInterrupt:
+            log("\n👋 Watch detenido", Colors.CYAN)
+        return 0
+
     try:
-        report = generate_report()
+        report = generate_report(**report_args)
 
         log("\n" + "=" * 60, Colors.CYAN)
         log("✅ Post task report completado exitosamente", Colors.GREEN)
         log("=" * 60, Colors.CYAN)
 
+        if args.fail_on_regression and report["regressions"]:
+            return 2
         return 0
 
     except Exception as e:
@@ -0,0 +1,150 @@
+# tests/python/auth_state.py
+import fcntl
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any
+
+from context_pool import CONTEXT_OPTIONS
+
+# Subir al cambiar el formato del storage state guardado
+STATE_VERSION = 1
+APPS_DIR = Path(__file__).resolve().parents[2] / "apps"
+BUILD_APPS = ("auth", "doctors", "patients")
+
+# Respuestas del mock de Supabase Auth por rol
+SUPABASE_AUTH_MOCKS = {
+    "doctor": {
+        "token": {"access_token": "fake-jwt-token-123", "refresh_token": "fake-refresh-token", "user": {"id": "doctor-123", "email": "doctor.demo@autamedica.com", "role": "doctor"}},
+        "user": {"id": "doctor-123", "email": "doctor.demo@autamedica.com", "user_metadata": {"role": "doctor", "first_name": "Dr. Demo", "last_name": "Test"}},
+    },
+    "patient": {
+        "token": {"access_token": "fake-jwt-token-patient", "refresh_token": "fake-refresh-token", "user": {"id": "patient_001", "email": "paciente.demo@autamedica.com", "role": "patient"}},
+        "user": {"id": "patient_001", "email": "paciente.demo@autamedica.com", "user_metadata": {"role": "patient", "first_name": "Juan", "last_name": "Pérez"}},
+    },
+}
+
+# URL a la que redirige un login exitoso de cada rol
+LOGIN_SUCCESS_URL = {
+    "doctor": "**/doctors**",
+    "patient": "**/patients**",
+}
+
+def supabase_auth_handler(role: str = "doctor"):
+    """Handler de page.route para **/auth/v1/** que simula Supabase Auth para el rol"""
+    mocks = SUPABASE_AUTH_MOCKS[role]
+
+    def handle_auth(route, request):
+        if "/auth/v1/token" in request.url and request.method == "POST":
+            # Mock de login exitoso
+            route.fulfill(
+                status=200,
+                headers={"content-type": "application/json"},
+                body=json.dumps(mocks["token"])
+            )
+        elif "/auth/v1/user" in request.url:
+            # Mock de datos de usuario
+            route.fulfill(
+                status=200,
+                headers={"content-type": "application/json"},
+                body=json.dumps(mocks["user"])
+            )
+        else:
+            route.continue_()
+
+    return handle_auth
+
+def build_fingerprint() -> str:
+    """
+    Identifica el build de las apps: AUTAMEDICA_BUILD_ID si está definido; si no, el
+    .next/BUILD_ID de auth/doctors/patients (contenido + mtime, que cambia en cada build
+    y en cada arranque de next dev).
+    """
+    if os.environ.get("AUTAMEDICA_BUILD_ID"):
+        return os.environ["AUTAMEDICA_BUILD_ID"]
+    parts = []
+    for app in BUILD_APPS:
+        build_id = APPS_DIR / app / ".next" / "BUILD_ID"
+        try:
+            parts.append(f"{app}:{build_id.read_text().strip()}:{build_id.stat().st_mtime_ns}")
+        except OSError:
+            parts.append(f"{app}:-")
+    return ";".join(parts)
+
+class AuthLoginError(RuntimeError):
+    """El login del rol ya falló en esta sesión; no se vuelve a intentar"""
+
+class AuthStateCache:
+    """
+    Storage state de Playwright por rol, guardado en disco. El login se hace una sola
+    vez por rol y se reutiliza entre pruebas y entre ejecuciones mientras no cambien
+    el mock de auth, el flujo de login, la configuración ni el build de las apps.
+    """
+
+    def __init__(self, browser, config: Dict[str, Any], cache_dir: Path):
+        self.browser = browser
+        self.config = config
+        self.cache_dir = Path(cache_dir)
+        self._paths: Dict[str, Path] = {}
+        # rol -> error del login fallido: las pruebas siguientes fallan sin esperar otra vez
+        self._failures: Dict[str, str] = {}
+
+    def state_key(self, role: str) -> str:
+        payload = json.dumps({
+            "version": STATE_VERSION,
+            "role": role,
+            "mock": SUPABASE_AUTH_MOCKS[role],
+            "handler": inspect.getsource(supabase_auth_handler),
+            "success_url": LOGIN_SUCCESS_URL[role],
+            "config": self.config,
+            "context": CONTEXT_OPTIONS,
+            "build": build_fingerprint(),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def state_path(self, role: str) -> Path:
+        """Ruta del storage state del rol; hace login si no hay uno válido en caché"""
+        if role in self._paths:
+            return self._paths[role]
+        if role in self._failures:
+            raise AuthLoginError(f"El login de {role} ya falló en esta sesión: {self._failures[role]}")
+
+        path = self.cache_dir / f"{role}-{self.state_key(role)}.json"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Con pytest-xdist sólo un worker hace el login; el resto espera y lo reutiliza
+        with open(self.cache_dir / f".{role}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if path.exists():
+                print(f"♻️ Sesión de {role} desde caché: {path.name}")
+            else:
+                try:
+                    self._login(role, path)
+                except Exception as exc:
+                    self._failures[role] = f"{type(exc).__name__}: {exc}"
+                    raise
+                for stale in self.cache_dir.glob(f"{role}-*.json"):
+                    if stale != path:
+                        stale.unlink()
+
+        self._paths[role] = path
+        return path
+
+    def _login(self, role: str, path: Path):
+        print(f"🔐 Login de {role} para cachear la sesión")
+        ctx = self.browser.new_context(**CONTEXT_OPTIONS)
+        try:
+            page = ctx.new_page()
+            page.route("**/auth/v1/**", supabase_auth_handler(role))
+            page.goto(f"{self.config['auth_url']}/login?role={role}")
+            page.fill("input[type='email']", self.config[f"{role}_email"])
+            page.fill("input[type='password']", self.config[f"{role}_password"])
+            page.click("button[type='submit']")
+            page.wait_for_url(LOGIN_SUCCESS_URL[role], timeout=15000)
+
+            tmp = path.with_suffix(".tmp")
+            ctx.storage_state(path=str(tmp))
+            tmp.replace(path)
+        finally:
+            ctx.close()
@@ -0,0 +1,192 @@
+# tests/python/baseline_store.py
+import fcntl
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+import imagehash
+from PIL import Image, ImageChops
+
+from utils import Region, screenshot_and_save, visual_diff
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def baseline_key(name: str, viewport: str, theme: str) -> str:
+    """Clave de la baseline en el manifiesto: página@viewport/tema"""
+    return f"{name}@{viewport}/{theme}"
+
+def file_sha256(path: Path) -> str:
+    """sha256 del archivo leído en bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compare_with_baseline(expected: str, actual: str, diff: str, entry: Dict[str, Any],
+                          threshold: int, mode: str, ignore_regions: Optional[List[Region]]) -> Dict[str, Any]:
+    """
+    Compara un screenshot con su baseline (se ejecuta en el pool de procesos).
+    En modo phash usa el hash precalculado del manifiesto y sólo decodifica la baseline
+    si hace falta escribir el diff.
+    """
+    if mode == "phash":
+        actual_img = Image.open(actual).convert("RGB")
+        score = imagehash.hex_to_hash(entry["phash"]) - imagehash.phash(actual_img)
+        if score > threshold:
+            expected_img = Image.open(expected).convert("RGB")
+            if actual_img.size != expected_img.size:
+                actual_img = actual_img.resize(expected_img.size)
+            Path(diff).parent.mkdir(parents=True, exist_ok=True)
+            ImageChops.difference(expected_img, actual_img).save(diff)
+    else:
+        score = visual_diff(Path(expected), Path(actual), Path(diff), mode=mode, ignore_regions=ignore_regions)
+    return {"score": score, "passed": score <= threshold}
+
+class BaselineStore:
+    """
+    Baselines visuales con un manifiesto (baselines/manifest.json) que guarda por
+    (página, viewport, tema) el archivo, su sha256 y su hash perceptual. Las
+    comparaciones corren en un pool de procesos compartido por la sesión.
+    """
+
+    def __init__(self, root: Path = BASELINES_DIR, update: bool = False, jobs: Optional[int] = None):
+        self.root = Path(root)
+        self.update = update
+        self.jobs = jobs or self._default_jobs()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.manifest = self._read_manifest()
+
+    @staticmethod
+    def _default_jobs() -> int:
+        # Con pytest-xdist cada worker tiene su pool: repartir los núcleos entre ellos
+        workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+        return max(1, (os.cpu_count() or 1) // workers)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: no hacer fork de un proceso con los hilos del driver de Playwright
+            self._pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def save(self, key: str, name: str, viewport: str, theme: str, actual: Path) -> Dict[str, Any]:
+        """Guarda el screenshot como baseline y actualiza el manifiesto (con lock entre workers)"""
+        sha256 = file_sha256(actual)
+        filename = f"{name}--{viewport}--{theme}.png"
+        current = self.manifest.get(key)
+        if current and current["sha256"] == sha256 and (self.root / current["file"]).exists():
+            # Sin cambios: no reescribir para no invalidar la caché de tiles
+            return current
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(actual, self.root / filename)
+        with Image.open(actual) as img:
+            entry = {
+                "file": filename,
+                "page": name,
+                "viewport": viewport,
+                "theme": theme,
+                "sha256": sha256,
+                "phash": str(imagehash.phash(img.convert("RGB"))),
+                "size": list(img.size),
+            }
+
+        with open(self.root / ".manifest.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.manifest = self._read_manifest()
+            self.manifest[key] = entry
+            tmp = self.manifest_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.manifest}, f, indent=2, sort_keys=True)
+                f.write("\n")
+            tmp.replace(self.manifest_path)
+        return entry
+
+    def submit(self, expected: Path, actual: Path, diff: Path, entry: Dict[str, Any], threshold: int,
+               mode: str = "phash", ignore_regions: Optional[List[Region]] = None) -> Future:
+        """Encola la comparación en el pool; si el contenido es idéntico ni siquiera decodifica"""
+        if file_sha256(actual) == entry["sha256"]:
+            done: Future = Future()
+            done.set_result({"score": 0, "passed": True})
+            return done
+        return self.pool.submit(compare_with_baseline, str(expected), str(actual), str(diff),
+                                entry, threshold, mode, ignore_regions)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+class VisualCheck:
+    """
+    Comparaciones visuales de una prueba. check() encola en el pool y retorna de
+    inmediato, así el resto de la prueba corre mientras se compara; verify() (en el
+    teardown del fixture visual_baselines) espera los resultados y falla la prueba.
+    """
+
+    def __init__(self, store: BaselineStore, artifacts_dir: Path):
+        self.store = store
+        self.artifacts_dir = artifacts_dir
+        # (clave, future o None si falta la baseline, ruta del diff)
+        self.pending: List[tuple] = []
+        self.updated: List[str] = []
+
+    def check(self, page, name: str, threshold: int = 6, theme: str = "light", full_page: bool = True,
+              mode: str = "phash", ignore_regions: Optional[List[Region]] = None):
+        """Captura el screenshot de la página y lo compara con la baseline de (name, viewport, theme)"""
+        size = page.viewport_size or {}
+        viewport = f"{size.get('width', 0)}x{size.get('height', 0)}"
+        key = baseline_key(name, viewport, theme)
+        stem = f"{name}--{viewport}--{theme}"
+        actual = self.artifacts_dir / f"{stem}_actual.png"
+        diff = self.artifacts_dir / f"{stem}_diff.png"
+        screenshot_and_save(page, actual, full_page=full_page)
+
+        if self.store.update:
+            self.store.save(key, name, viewport, theme, actual)
+            self.updated.append(key)
+            return
+
+        entry = self.store.manifest.get(key)
+        expected = self.store.root / entry["file"] if entry else None
+        if expected is None or not expected.exists():
+            self.pending.append((key, None, diff))
+            return
+        future = self.store.submit(expected, actual, diff, entry, threshold, mode, ignore_regions)
+        self.pending.append((key, future, diff))
+
+    def verify(self):
+        """Espera las comparaciones pendientes y falla con todas las regresiones juntas"""
+        failures = []
+        for key, future, diff in self.pending:
+            if future is None:
+                failures.append(f"{key}: no hay baseline. Ejecuta pytest con --update-baselines para crearla.")
+                continue
+            result = future.result()
+            if not result["passed"]:
+                failures.append(f"{key}: regresión visual detectada. Diff: {result['score']}. Ver diff en: {diff}")
+        self.pending = []
+        if failures:
+            raise AssertionError("\n".join(failures))
@@ -5,6 +5,11 @@ import os
 import time
 from pathlib import Path
 
+from auth_state import AuthLoginError, AuthStateCache, supabase_auth_handler
+from baseline_store import BaselineStore, VisualCheck
+from context_pool import ContextPool, recording_dir
+from utils import track_network
+
 # Configuración de AutaMedica
 AUTAMEDICA_CONFIG = {
     "base_url": "http://localhost:3000",
@@ -14,10 +19,43 @@ AUTAMEDICA_CONFIG = {
     "signaling_url": "ws://localhost:8888",
     "doctor_email": "doctor.demo@autamedica.com",
     "doctor_password": "Demo1234",
+    "patient_email": "paciente.demo@autamedica.com",
+    "patient_password": "Demo1234",
     "patient_id": "patient_001",
     "patient_name": "Juan Pérez"
 }
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        default=False,
+        help="Regenera las baselines visuales (y su manifiesto) en lugar de compararlas",
+    )
+    parser.addoption(
+        "--recording",
+        choices=["off", "on-failure", "always"],
+        default="on-failure",
+        help="Trace de Playwright (DOM, sin screenshots) sólo de pruebas fallidas (on-failure), nunca, o video + trace con screenshots siempre",
+    )
+    parser.addoption(
+        "--context-pool-size",
+        type=int,
+        default=2,
+        help="Contextos de navegador precreados por worker",
+    )
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "record: graba video y trace de la prueba aunque pase")
+    config.addinivalue_line("markers", "authenticated(role): contexto con la sesión del rol (doctor/patient) ya iniciada")
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Deja el resultado de cada fase en item.rep_<fase> para los fixtures"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
 @pytest.fixture(scope="session")
 def playwright_instance():
     """Instancia de Playwright para toda la sesión de tests"""
@@ -48,30 +86,79 @@ def browser(playwright_instance):
     yield browser
     browser.close()
 
+@pytest.fixture(scope="session")
+def auth_states(browser, request):
+    """Sesiones de login por rol (storage state en disco), hechas una vez por sesión"""
+    cache = getattr(request.config, "cache", None)
+    cache_dir = cache.mkdir("autamedica-auth") if cache is not None else Path("test-results") / "auth"
+    return AuthStateCache(browser, AUTAMEDICA_CONFIG, cache_dir)
+
+@pytest.fixture(scope="session")
+def context_pools(browser, auth_states, request):
+    """
+    Contextos precreados con la configuración de AutaMedica, reutilizados entre pruebas.
+    context_pools(None) no tiene sesión; context_pools("doctor") nace autenticado.
+    """
+    pools = {None: ContextPool(browser, size=request.config.getoption("--context-pool-size"))}
+
+    def pool_for(role=None):
+        if role not in pools:
+            try:
+                storage_state = auth_states.state_path(role)
+            except AuthLoginError as exc:
+                error = str(exc)
+            else:
+                error = None
+            if error is not None:
+                pytest.fail(error, pytrace=False)
+            pools[role] = ContextPool(browser, size=1, storage_state=storage_state)
+        return pools[role]
+
+    yield pool_for
+    for pool in pools.values():
+        pool.close()
+
+def _auth_role(request):
+    marker = request.node.get_closest_marker("authenticated")
+    if marker is None:
+        return None
+    return marker.args[0] if marker.args else "doctor"
+
 @pytest.fixture(scope="function")
-def context(browser, tmp_path_factory):
-    """Contexto por prueba para aislar cookies/localStorage"""
-    user_data_dir = tmp_path_factory.mktemp("autamedica_profile")
-    
-    # Configuración específica para AutaMedica
-    ctx = browser.new_context(
-        viewport={"width": 1280, "height": 800},
-        record_video_dir=str(user_data_dir / "videos"),
-        bypass_csp=True,
-        permissions=["camera", "microphone", "geolocation"],
-        geolocation={"latitude": -0.2299, "longitude": -78.5249},  # Quito, Ecuador
-        timezone_id="America/Guayaquil",
-        locale="es-EC",
-        user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+def context(context_pools, request):
+    """
+    Contexto por prueba para aislar cookies/localStorage (limpiado al devolverlo al pool).
+    Con @pytest.mark.authenticated("doctor" | "patient") llega con la sesión ya iniciada.
+    """
+    recording = request.config.getoption("--recording")
+    marker = request.node.get_closest_marker("record")
+    out_dir = recording_dir(request.node.nodeid)
+    context_pool = context_pools(_auth_role(request))
+
+    # El video sólo se puede activar al crear el contexto: fuera del pool
+    record_video = marker is not None or recording == "always"
+    ctx = context_pool.recording_context(out_dir) if record_video else context_pool.acquire()
+    tracing = recording != "off" or marker is not None
+    if tracing:
+        # Los screenshots del trace son lo caro: sólo cuando se graba la prueba entera
+        ctx.tracing.start(screenshots=record_video, snapshots=True)
     
     yield ctx
     
-    # Cleanup
-    try:
-        ctx.close()
-    except Exception:
-        pass
+    reports = (getattr(request.node, "rep_setup", None), getattr(request.node, "rep_call", None))
+    failed = any(report is not None and report.failed for report in reports)
+    if tracing:
+        try:
+            keep = failed or record_video
+            ctx.tracing.stop(path=str(out_dir / "trace.zip") if keep else None)
+            if keep:
+                print(f"🎞️ Trace guardado en {out_dir / 'trace.zip'}")
+        except Exception:
+            pass
+
+    # Cleanup: el contexto que graba video nunca vuelve al pool (release lo descarta).
+    # Un contexto de una prueba fallida puede quedar en un estado raro: no reutilizarlo
+    context_pool.release(ctx, reusable=not (failed or record_video))
 
 @pytest.fixture(scope="function")
 def page(context):
@@ -82,6 +169,9 @@ def page(context):
     page.set_extra_http_headers({
         "Accept-Language": "es-EC,es;q=0.9,en;q=0.8",
     })
+
+    # Contar peticiones desde la primera navegación para wait_for_network_idle
+    track_network(page)
     
     yield page
     
@@ -97,26 +187,9 @@ def autamedica_config():
     return AUTAMEDICA_CONFIG
 
 @pytest.fixture(scope="function")
-def mock_supabase_auth(page):
-    """Mock de autenticación Supabase para tests"""
-    def handle_auth(route, request):
-        if "/auth/v1/token" in request.url and request.method == "POST":
-            # Mock de login exitoso
-            route.fulfill(
-                status=200,
-                headers={"content-type": "application/json"},
-                body='{"access_token": "fake-jwt-token-123", "refresh_token": "fake-refresh-token", "user": {"id": "doctor-123", "email": "doctor.demo@autamedica.com", "role": "doctor"}}'
-            )
-        elif "/auth/v1/user" in request.url:
-            # Mock de datos de usuario
-            route.fulfill(
-                status=200,
-                headers={"content-type": "application/json"},
-                body='{"id": "doctor-123", "email": "doctor.demo@autamedica.com", "user_metadata": {"role": "doctor", "first_name": "Dr. Demo", "last_name": "Test"}}'
-            )
-        else:
-            route.continue_()
-    
+def mock_supabase_auth(page, request):
+    """Mock de autenticación Supabase para tests (del rol de @pytest.mark.authenticated, o doctor)"""
+    handle_auth = supabase_auth_handler(_auth_role(request) or "doctor")
     page.route("**/auth/v1/**", handle_auth)
     return handle_auth
 
@@ -158,4 +231,21 @@ def test_artifacts_dir(tmp_path):
     """Directorio para artefactos de test (screenshots, videos, etc.)"""
     artifacts_dir = tmp_path / "artifacts"
     artifacts_dir.mkdir(exist_ok=True)
-    return artifacts_dir
\ No newline at end of file
+    return artifacts_dir
+
+@pytest.fixture(scope="session")
+def baseline_store(request):
+    """Baselines visuales con manifiesto y pool de comparación para toda la sesión"""
+    store = BaselineStore(update=request.config.getoption("--update-baselines"))
+    yield store
+    store.close()
+
+@pytest.fixture(scope="function")
+def visual_baselines(baseline_store, test_artifacts_dir):
+    """
+    Comparaciones visuales de la prueba: visual_baselines.check(page, "nombre", threshold=...).
+    Las regresiones hacen fallar la prueba en su teardown, al esperar los resultados.
+    """
+    visual = VisualCheck(baseline_store, test_artifacts_dir)
+    yield visual
+    visual.verify()
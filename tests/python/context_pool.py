@@ -0,0 +1,135 @@
+# tests/python/context_pool.py
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+# Configuración específica para AutaMedica
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1280, "height": 800},
+    "bypass_csp": True,
+    "permissions": ["camera", "microphone", "geolocation"],
+    "geolocation": {"latitude": -0.2299, "longitude": -78.5249},  # Quito, Ecuador
+    "timezone_id": "America/Guayaquil",
+    "locale": "es-EC",
+    "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+
+RECORDINGS_DIR = Path("test-results") / "recordings"
+
+def recording_dir(nodeid: str) -> Path:
+    """Carpeta de video/trace de una prueba a partir de su nodeid"""
+    return RECORDINGS_DIR / re.sub(r"[^\w.-]+", "_", nodeid).strip("_")
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+class ContextPool:
+    """
+    Contextos de navegador precreados con la configuración de AutaMedica.
+    Al devolver un contexto se cierran sus páginas y se limpian cookies, storage
+    (localStorage, IndexedDB, service workers, caché) de cada origen visitado y
+    permisos, en lugar de reconstruirlo en cada prueba.
+    Con storage_state (sesión guardada por auth_state.py) los contextos nacen
+    autenticados y la sesión se restaura después de cada limpieza.
+    """
+
+    def __init__(self, browser, size: int = 2, options: Optional[Dict] = None, storage_state: Optional[Path] = None):
+        self.browser = browser
+        self.options = dict(options or CONTEXT_OPTIONS)
+        self.storage_state = None
+        if storage_state is not None:
+            self.options["storage_state"] = str(storage_state)
+            with open(storage_state) as f:
+                self.storage_state = json.load(f)
+        self.idle: List = []
+        self._origins: Dict[object, Set[str]] = {}
+        for _ in range(size):
+            self.idle.append(self._create())
+
+    def _create(self, **extra):
+        ctx = self.browser.new_context(**self.options, **extra)
+        origins: Set[str] = set()
+
+        def on_request(request):
+            origin = _origin(request.url)
+            if origin:
+                origins.add(origin)
+
+        ctx.on("request", on_request)
+        self._origins[ctx] = origins
+        return ctx
+
+    def acquire(self):
+        """Contexto limpio del pool (o uno nuevo si están todos en uso)"""
+        return self.idle.pop() if self.idle else self._create()
+
+    def recording_context(self, video_dir: Path):
+        """Contexto fuera del pool que graba video (sólo para pruebas que lo piden)"""
+        return self._create(record_video_dir=str(video_dir))
+
+    def release(self, ctx, reusable: bool = True):
+        """Devuelve el contexto al pool tras limpiarlo; si no se puede limpiar, se cierra"""
+        if reusable:
+            try:
+                self._reset(ctx)
+                self.idle.append(ctx)
+                return
+            except Exception as exc:
+                print(f"⚠️ No se pudo limpiar el contexto, se descarta: {exc}")
+        self._discard(ctx)
+
+    def _reset(self, ctx):
+        for page in ctx.pages:
+            page.close()
+
+        origins = self._origins[ctx]
+        if origins:
+            page = ctx.new_page()
+            cdp = ctx.new_cdp_session(page)
+            for origin in sorted(origins):
+                cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            cdp.detach()
+            page.close()
+            origins.clear()
+
+        ctx.clear_cookies()
+        ctx.clear_permissions()
+        ctx.grant_permissions(self.options["permissions"])
+        ctx.set_geolocation(self.options["geolocation"])
+        ctx.set_offline(False)
+        ctx.set_extra_http_headers({})
+        if self.storage_state:
+            self._restore_storage_state(ctx)
+
+    def _restore_storage_state(self, ctx):
+        """Vuelve a cargar cookies y localStorage de la sesión guardada"""
+        ctx.add_cookies(self.storage_state.get("cookies", []))
+        origins = [o for o in self.storage_state.get("origins", []) if o.get("localStorage")]
+        if not origins:
+            return
+        # Página en blanco servida por route: no hace falta que el servidor responda
+        page = ctx.new_page()
+        page.route("**/*", lambda route: route.fulfill(status=200, content_type="text/html", body="<html></html>"))
+        for entry in origins:
+            page.goto(entry["origin"])
+            page.evaluate(
+                "items => items.forEach(({name, value}) => localStorage.setItem(name, value))",
+                entry["localStorage"],
+            )
+        page.close()
+
+    def _discard(self, ctx):
+        self._origins.pop(ctx, None)
+        try:
+            ctx.close()
+        except Exception:
+            pass
+
+    def close(self):
+        while self.idle:
+            self._discard(self.idle.pop())
@@ -70,27 +70,20 @@ def test_autamedica_login_page_accessibility(page, autamedica_config, test_artif
     assert submit_button.is_visible(), "Botón de submit no visible"
     assert submit_button.is_enabled(), "Botón de submit no está habilitado"
 
+@pytest.mark.authenticated("doctor")
 def test_autamedica_doctors_dashboard_accessibility(page, autamedica_config, mock_supabase_auth, test_artifacts_dir):
     """Test de accesibilidad para el dashboard de doctores"""
     
-    # 1. Login como doctor
-    log_test_step(page, "Realizando login de doctor", test_artifacts_dir)
-    page.goto(f"{autamedica_config['auth_url']}/login?role=doctor")
-    page.fill("input[type='email']", autamedica_config['doctor_email'])
-    page.fill("input[type='password']", autamedica_config['doctor_password'])
-    page.click("button[type='submit']")
-    page.wait_for_url("**/doctors**", timeout=15000)
-    
-    # 2. Navegar al dashboard
+    # 1. Navegar al dashboard
     log_test_step(page, "Navegando al dashboard de doctores", test_artifacts_dir)
     page.goto(autamedica_config['doctors_url'])
     wait_for_network_idle(page)
     
-    # 3. Ejecutar auditoría de accesibilidad
+    # 2. Ejecutar auditoría de accesibilidad
     log_test_step(page, "Ejecutando auditoría de accesibilidad del dashboard", test_artifacts_dir)
     result = run_accessibility_audit(page)
     
-    # 4. Analizar resultados
+    # 3. Analizar resultados
     violations = result.get("violations", [])
     critical_violations = [v for v in violations if v.get("impact") in ("serious", "critical")]
     
@@ -98,10 +91,10 @@ def test_autamedica_doctors_dashboard_accessibility(page, autamedica_config, moc
     print(f"❌ Violaciones encontradas: {len(violations)}")
     print(f"🚨 Violaciones críticas: {len(critical_violations)}")
     
-    # 5. Assertions
+    # 4. Assertions
     assert len(critical_violations) == 0, f"Violaciones críticas de accesibilidad en dashboard: {len(critical_violations)}"
     
-    # 6. Verificaciones específicas del dashboard
+    # 5. Verificaciones específicas del dashboard
     log_test_step(page, "Verificando elementos específicos del dashboard", test_artifacts_dir)
     
     # Verificar que hay navegación principal
@@ -122,17 +115,12 @@ def test_autamedica_doctors_dashboard_accessibility(page, autamedica_config, moc
         
         assert button_text or aria_label or title, f"Botón {i} no tiene texto, aria-label o title accesible"
 
+@pytest.mark.authenticated("doctor")
 def test_autamedica_video_call_interface_accessibility(page, autamedica_config, mock_supabase_auth, mock_webrtc_signaling, test_artifacts_dir):
     """Test de accesibilidad para la interfaz de videollamada"""
     
-    # 1. Login y navegar a videollamada
+    # 1. Navegar a videollamada (sesión de doctor ya iniciada)
     log_test_step(page, "Iniciando flujo de videollamada", test_artifacts_dir)
-    page.goto(f"{autamedica_config['auth_url']}/login?role=doctor")
-    page.fill("input[type='email']", autamedica_config['doctor_email'])
-    page.fill("input[type='password']", autamedica_config['doctor_password'])
-    page.click("button[type='submit']")
-    page.wait_for_url("**/doctors**", timeout=15000)
-    
     page.goto(autamedica_config['doctors_url'])
     page.wait_for_load_state("networkidle")
     
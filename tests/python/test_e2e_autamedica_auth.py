@@ -59,6 +59,7 @@ def test_autamedica_doctor_login_flow(page, autamedica_config, mock_supabase_aut
     # 9. Guardar artefactos
     save_test_artifacts(page, "doctor_login_flow", test_artifacts_dir)
 
+@pytest.mark.authenticated("doctor")
 @retry_on_exception(retries=3, delay=2.0)
 def test_autamedica_video_call_flow(page, autamedica_config, mock_supabase_auth, mock_webrtc_signaling, mock_patient_data, test_artifacts_dir):
     """Test completo de flujo de videollamada en AutaMedica"""
@@ -66,20 +67,12 @@ def test_autamedica_video_call_flow(page, autamedica_config, mock_supabase_auth,
     # Configurar permisos WebRTC
     mock_webrtc_permissions(page)
     
-    # 1. Login como doctor
-    log_test_step(page, "Iniciando login de doctor", test_artifacts_dir)
-    page.goto(f"{autamedica_config['auth_url']}/login?role=doctor")
-    page.fill("input[type='email']", autamedica_config['doctor_email'])
-    page.fill("input[type='password']", autamedica_config['doctor_password'])
-    page.click("button[type='submit']")
-    page.wait_for_url("**/doctors**", timeout=15000)
-    
-    # 2. Navegar al dashboard de doctores
+    # 1. Navegar al dashboard de doctores
     log_test_step(page, "Cargando dashboard de doctores", test_artifacts_dir)
     page.goto(autamedica_config['doctors_url'])
     wait_for_network_idle(page)
     
-    # 3. Buscar y hacer clic en botón de videollamada
+    # 2. Buscar y hacer clic en botón de videollamada
     log_test_step(page, "Buscando botón de videollamada", test_artifacts_dir)
     
     # Buscar diferentes variantes del botón de videollamada
@@ -105,26 +98,26 @@ def test_autamedica_video_call_flow(page, autamedica_config, mock_supabase_auth,
     assert call_button is not None, "No se encontró botón de videollamada"
     call_button.click()
     
-    # 4. Esperar a que se abra la sala de videollamada
+    # 3. Esperar a que se abra la sala de videollamada
     log_test_step(page, "Esperando apertura de sala de videollamada", test_artifacts_dir)
     page.wait_for_timeout(3000)
     
-    # 5. Verificar que estamos en una sala de videollamada
+    # 4. Verificar que estamos en una sala de videollamada
     current_url = page.url
     assert "call/" in current_url or "room/" in current_url or "videollamada" in current_url.lower()
     
-    # 6. Verificar elementos de video
+    # 5. Verificar elementos de video
     log_test_step(page, "Verificando elementos de video", test_artifacts_dir)
     video_elements = page.locator("video")
     video_count = video_elements.count()
     assert video_count > 0, "No se encontraron elementos de video"
     
-    # 7. Verificar conexión WebRTC (simulada)
+    # 6. Verificar conexión WebRTC (simulada)
     log_test_step(page, "Verificando conexión WebRTC", test_artifacts_dir)
     webrtc_connected = wait_for_webrtc_connection(page, timeout=10000)
     assert webrtc_connected, "Conexión WebRTC no establecida"
     
-    # 8. Verificar controles de video
+    # 7. Verificar controles de video
     log_test_step(page, "Verificando controles de video", test_artifacts_dir)
     control_selectors = [
         "button[title*='micrófono']",
@@ -143,7 +136,7 @@ def test_autamedica_video_call_flow(page, autamedica_config, mock_supabase_auth,
     
     assert controls_found > 0, "No se encontraron controles de video"
     
-    # 9. Simular cierre de llamada
+    # 8. Simular cierre de llamada
     log_test_step(page, "Cerrando llamada", test_artifacts_dir)
     hangup_selectors = [
         "button[title*='colgar']",
@@ -165,7 +158,7 @@ def test_autamedica_video_call_flow(page, autamedica_config, mock_supabase_auth,
         hangup_button.click()
         page.wait_for_timeout(1000)
     
-    # 10. Guardar artefactos
+    # 9. Guardar artefactos
     save_test_artifacts(page, "video_call_flow", test_artifacts_dir)
 
 def test_autamedica_patient_reception_flow(page, autamedica_config, mock_supabase_auth, mock_webrtc_signaling, test_artifacts_dir):
@@ -42,18 +42,11 @@ def test_autamedica_login_page_performance(page, autamedica_config, test_artifac
         memory_usage_ratio = memory['usedJSHeapSize'] / memory['jsHeapSizeLimit']
         assert memory_usage_ratio < 0.8, f"Uso de memoria demasiado alto: {memory_usage_ratio:.2%}"
 
+@pytest.mark.authenticated("doctor")
 def test_autamedica_doctors_dashboard_performance(page, autamedica_config, mock_supabase_auth, test_artifacts_dir):
     """Test de performance para el dashboard de doctores"""
     
-    # 1. Login como doctor
-    log_test_step(page, "Realizando login de doctor", test_artifacts_dir)
-    page.goto(f"{autamedica_config['auth_url']}/login?role=doctor")
-    page.fill("input[type='email']", autamedica_config['doctor_email'])
-    page.fill("input[type='password']", autamedica_config['doctor_password'])
-    page.click("button[type='submit']")
-    page.wait_for_url("**/doctors**", timeout=15000)
-    
-    # 2. Navegar al dashboard y medir performance
+    # 1. Navegar al dashboard y medir performance
     log_test_step(page, "Cargando dashboard de doctores", test_artifacts_dir)
     start_time = time.time()
     
@@ -62,36 +55,31 @@ def test_autamedica_doctors_dashboard_performance(page, autamedica_config, mock_
     
     load_time = time.time() - start_time
     
-    # 3. Obtener métricas de performance
+    # 2. Obtener métricas de performance
     log_test_step(page, "Recopilando métricas de performance del dashboard", test_artifacts_dir)
     metrics = get_performance_metrics(page)
     
-    # 4. Verificar tiempos de carga
+    # 3. Verificar tiempos de carga
     print(f"⏱️ Tiempo de carga del dashboard: {load_time:.2f}s")
     print(f"⏱️ DOM Content Loaded: {metrics.get('domContentLoaded', 0)}ms")
     print(f"⏱️ Load Complete: {metrics.get('loadComplete', 0)}ms")
     
-    # 5. Assertions de performance
+    # 4. Assertions de performance
     assert load_time < 8.0, f"Tiempo de carga del dashboard demasiado lento: {load_time:.2f}s"
     assert metrics.get('domContentLoaded', 0) < 5000, f"DOM Content Loaded del dashboard demasiado lento: {metrics.get('domContentLoaded', 0)}ms"
     
-    # 6. Verificar que no hay memory leaks después de la carga
+    # 5. Verificar que no hay memory leaks después de la carga
     memory = metrics.get('memory')
     if memory:
         memory_usage_ratio = memory['usedJSHeapSize'] / memory['jsHeapSizeLimit']
         assert memory_usage_ratio < 0.8, f"Uso de memoria del dashboard demasiado alto: {memory_usage_ratio:.2%}"
 
+@pytest.mark.authenticated("doctor")
 def test_autamedica_video_call_performance(page, autamedica_config, mock_supabase_auth, mock_webrtc_signaling, test_artifacts_dir):
     """Test de performance para la interfaz de videollamada"""
     
-    # 1. Login y navegar a videollamada
+    # 1. Navegar a videollamada (sesión de doctor ya iniciada)
     log_test_step(page, "Iniciando flujo de videollamada", test_artifacts_dir)
-    page.goto(f"{autamedica_config['auth_url']}/login?role=doctor")
-    page.fill("input[type='email']", autamedica_config['doctor_email'])
-    page.fill("input[type='password']", autamedica_config['doctor_password'])
-    page.click("button[type='submit']")
-    page.wait_for_url("**/doctors**", timeout=15000)
-    
     page.goto(autamedica_config['doctors_url'])
     page.wait_for_load_state("networkidle")
     
@@ -251,16 +239,14 @@ def test_autamedica_mobile_performance(page, autamedica_config, test_artifacts_d
     assert submit_button.is_visible(), "Botón de submit no visible en móvil"
     assert submit_button.is_enabled(), "Botón de submit no está habilitado en móvil"
 
+@pytest.mark.authenticated("doctor")
 def test_autamedica_memory_usage_over_time(page, autamedica_config, mock_supabase_auth, test_artifacts_dir):
     """Test de uso de memoria a lo largo del tiempo"""
     
-    # 1. Login como doctor
-    log_test_step(page, "Realizando login inicial", test_artifacts_dir)
-    page.goto(f"{autamedica_config['auth_url']}/login?role=doctor")
-    page.fill("input[type='email']", autamedica_config['doctor_email'])
-    page.fill("input[type='password']", autamedica_config['doctor_password'])
-    page.click("button[type='submit']")
-    page.wait_for_url("**/doctors**", timeout=15000)
+    # 1. Cargar dashboard (sesión de doctor ya iniciada)
+    log_test_step(page, "Cargando dashboard de doctores", test_artifacts_dir)
+    page.goto(autamedica_config['doctors_url'])
+    wait_for_network_idle(page)
     
     # 2. Medir memoria inicial
     log_test_step(page, "Midiendo memoria inicial", test_artifacts_dir)
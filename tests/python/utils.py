@@ -1,22 +1,37 @@
 # tests/python/utils.py
+import hashlib
 import json
 import time
 from pathlib import Path
+import numpy as np
 from PIL import Image, ImageChops
 import imagehash
 import requests
-from typing import Optional, Dict, Any
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from typing import Optional, Dict, Any, List, Tuple
+
+# Comparación por tiles: tamaño del tile, SSIM mínimo y caché de hashes junto a las baselines
+TILE_SIZE = 256
+SSIM_THRESHOLD = 0.98
+TILE_CACHE_DIR = ".tiles"
+DIFF_MOSAIC_COLUMNS = 4
+Region = Tuple[int, int, int, int]
 
 def screenshot_and_save(page, path: Path, full_page: bool = True):
     """Captura screenshot y lo guarda en la ruta especificada"""
     path.parent.mkdir(parents=True, exist_ok=True)
     page.screenshot(path=str(path), full_page=full_page)
 
-def visual_diff(expected_path: Path, actual_path: Path, diff_path: Path, threshold_hash_diff: int = 5):
+def visual_diff(expected_path: Path, actual_path: Path, diff_path: Path, threshold_hash_diff: int = 5,
+                mode: str = "phash", ignore_regions: Optional[List[Region]] = None):
     """
     Comparación visual de imágenes usando hash perceptual
     Retorna la diferencia de hash (0 = idénticas, > threshold = diferentes)
+    Con mode="tiles" compara por tiles (ver tile_diff) y retorna la cantidad de tiles cambiados
     """
+    if mode == "tiles":
+        return len(tile_diff(expected_path, actual_path, diff_path, ignore_regions)["changed"])
+
     expected = Image.open(expected_path).convert("RGB")
     actual = Image.open(actual_path).convert("RGB")
     
@@ -37,37 +52,231 @@ def visual_diff(expected_path: Path, actual_path: Path, diff_path: Path, thresho
     
     return diff
 
-def wait_for_network_idle(page, timeout: int = 5000, idle_time: int = 500):
+def ignore_regions_for(page, selectors: List[str]) -> List[Region]:
+    """
+    Regiones (x, y, ancho, alto) en píxeles del screenshot de página completa para los
+    elementos dinámicos que coinciden con los selectores (video, relojes, etc.)
+    """
+    rects = page.evaluate("""
+        (selectors) => {
+            const dpr = window.devicePixelRatio || 1;
+            return selectors.flatMap(sel => Array.from(document.querySelectorAll(sel)).map(el => {
+                const r = el.getBoundingClientRect();
+                return [(r.left + window.scrollX) * dpr, (r.top + window.scrollY) * dpr,
+                        r.width * dpr, r.height * dpr];
+            }));
+        }
+    """, selectors)
+    return [tuple(int(round(v)) for v in rect) for rect in rects if rect[2] > 0 and rect[3] > 0]
+
+def _load_pixels(path: Path, ignore_regions: Optional[List[Region]]) -> np.ndarray:
+    """Decodifica el PNG a un array RGB uint8 con las regiones ignoradas en negro"""
+    with Image.open(path) as img:
+        pixels = np.array(img.convert("RGB"))
+    for x, y, w, h in ignore_regions or ():
+        pixels[max(y, 0):max(y + h, 0), max(x, 0):max(x + w, 0)] = 0
+    return pixels
+
+def _tile_hashes(pixels: np.ndarray, tile_size: int) -> np.ndarray:
+    """Hash de contenido (blake2b de 16 bytes) por tile, con forma (filas, columnas, 16)"""
+    rows = -(-pixels.shape[0] // tile_size)
+    cols = -(-pixels.shape[1] // tile_size)
+    hashes = np.empty((rows, cols, 16), dtype=np.uint8)
+    for r in range(rows):
+        band = pixels[r * tile_size:(r + 1) * tile_size]
+        for c in range(cols):
+            tile = np.ascontiguousarray(band[:, c * tile_size:(c + 1) * tile_size])
+            digest = hashlib.blake2b(repr(tile.shape).encode(), digest_size=16)
+            digest.update(tile.data)
+            hashes[r, c] = np.frombuffer(digest.digest(), dtype=np.uint8)
+    return hashes
+
+def _baseline_tile_hashes(expected_path: Path, tile_size: int,
+                          ignore_regions: Optional[List[Region]]) -> Optional[np.ndarray]:
+    """
+    Hashes por tile de la baseline desde la caché en disco (baselines/.tiles/<nombre>.npz).
+    La entrada vale mientras no cambien la baseline (mtime + tamaño), el tile ni las regiones.
+    """
+    stat = expected_path.stat()
+    key = json.dumps([stat.st_mtime_ns, stat.st_size, tile_size, sorted(map(list, ignore_regions or ()))])
+    cache_path = expected_path.parent / TILE_CACHE_DIR / (expected_path.stem + ".npz")
+    if cache_path.exists():
+        try:
+            with np.load(cache_path) as cached:
+                if str(cached["key"]) == key:
+                    return cached["hashes"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    hashes = _tile_hashes(_load_pixels(expected_path, ignore_regions), tile_size)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.stem + ".tmp.npz")
+    np.savez(tmp, key=np.array(key), hashes=hashes)
+    tmp.replace(cache_path)
+    return hashes
+
+def _ssim(a: np.ndarray, b: np.ndarray) -> float:
+    """SSIM de luminancia sobre ventanas de 8x8 sin solapamiento, promediado"""
+    weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    a = a.astype(np.float32) @ weights
+    b = b.astype(np.float32) @ weights
+    h, w = (a.shape[0] // 8) * 8, (a.shape[1] // 8) * 8
+    if not h or not w:
+        return 1.0 if np.array_equal(a, b) else 0.0
+    a = a[:h, :w].reshape(h // 8, 8, w // 8, 8)
+    b = b[:h, :w].reshape(h // 8, 8, w // 8, 8)
+    mu_a, mu_b = a.mean(axis=(1, 3)), b.mean(axis=(1, 3))
+    var_a, var_b = a.var(axis=(1, 3)), b.var(axis=(1, 3))
+    cov = (a * b).mean(axis=(1, 3)) - mu_a * mu_b
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+def tile_diff(expected_path: Path, actual_path: Path, diff_path: Path,
+              ignore_regions: Optional[List[Region]] = None, tile_size: int = TILE_SIZE,
+              ssim_threshold: float = SSIM_THRESHOLD) -> Dict[str, Any]:
+    """
+    Comparación por tiles con NumPy. Los tiles con el mismo hash que la baseline (cacheado
+    en disco) se descartan sin decodificar la baseline; el resto se mide con SSIM y sólo
+    los que quedan bajo ssim_threshold cuentan como cambiados. El diff es un mosaico con
+    sólo esos tiles, así que su costo escala con el cambio y no con el alto de la página.
+    Retorna {"tiles": total, "changed": [(fila, columna, ssim)], "diff_path": ruta o None}
+    """
+    expected_hashes = _baseline_tile_hashes(expected_path, tile_size, ignore_regions)
+    actual = _load_pixels(actual_path, ignore_regions)
+    actual_hashes = _tile_hashes(actual, tile_size)
+
+    rows = max(expected_hashes.shape[0], actual_hashes.shape[0])
+    cols = max(expected_hashes.shape[1], actual_hashes.shape[1])
+    same = np.zeros((rows, cols), dtype=bool)
+    r, c = min(expected_hashes.shape[0], actual_hashes.shape[0]), min(expected_hashes.shape[1], actual_hashes.shape[1])
+    same[:r, :c] = (expected_hashes[:r, :c] == actual_hashes[:r, :c]).all(axis=-1)
+    candidates = np.argwhere(~same)
+
+    result = {"tiles": rows * cols, "changed": [], "diff_path": None}
+    if not len(candidates):
+        return result
+
+    # La baseline sólo se decodifica si hay tiles sospechosos
+    expected = _load_pixels(expected_path, ignore_regions)
+    def tile_of(pixels, row, col):
+        tile = np.zeros((tile_size, tile_size, 3), dtype=np.uint8)
+        part = pixels[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size]
+        tile[:part.shape[0], :part.shape[1]] = part
+        return tile, part.shape[:2]
+
+    for row, col in candidates:
+        a, a_shape = tile_of(expected, row, col)
+        b, b_shape = tile_of(actual, row, col)
+        score = _ssim(a, b) if a_shape == b_shape else 0.0
+        if score < ssim_threshold:
+            result["changed"].append((int(row), int(col), round(score, 4)))
+
+    if result["changed"]:
+        # Mosaico con sólo los tiles cambiados, en el orden de result["changed"]
+        per_row = min(len(result["changed"]), DIFF_MOSAIC_COLUMNS)
+        mosaic_rows = -(-len(result["changed"]) // per_row)
+        mosaic = np.zeros((mosaic_rows * tile_size, per_row * tile_size, 3), dtype=np.uint8)
+        for i, (row, col, _) in enumerate(result["changed"]):
+            a, _ = tile_of(expected, row, col)
+            b, _ = tile_of(actual, row, col)
+            y, x = (i // per_row) * tile_size, (i % per_row) * tile_size
+            mosaic[y:y + tile_size, x:x + tile_size] = np.abs(a.astype(np.int16) - b.astype(np.int16))
+        diff_path.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(mosaic).save(diff_path)
+        result["diff_path"] = diff_path
+    return result
+
+# Recursos de larga duración que nunca "terminan" y no deben bloquear el idle
+LONG_LIVED_RESOURCE_TYPES = {"websocket", "eventsource", "media"}
+
+class NetworkIdleTracker:
+    """
+    Cuenta las peticiones en vuelo de una página. Se instala una sola vez por página
+    (ver track_network) y despierta con los eventos de Playwright en lugar de hacer polling.
+    """
+
+    def __init__(self, page, ignored_resource_types=LONG_LIVED_RESOURCE_TYPES):
+        self.page = page
+        self.ignored_resource_types = set(ignored_resource_types)
+        self.inflight = set()
+        self.idle_since = time.monotonic()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+        page.once("close", lambda _: self.detach())
+
+    def _tracked(self, request) -> bool:
+        return request.resource_type not in self.ignored_resource_types
+
+    def _on_request(self, request):
+        if self._tracked(request):
+            self.inflight.add(request)
+
+    def _on_request_done(self, request):
+        if request in self.inflight:
+            self.inflight.discard(request)
+            if not self.inflight:
+                self.idle_since = time.monotonic()
+
+    def wait(self, timeout: int = 5000, idle_time: int = 500) -> bool:
+        """
+        Espera a que no haya peticiones en vuelo durante idle_time ms.
+        Retorna False si se agota el timeout antes.
+        """
+        deadline = time.monotonic() + timeout / 1000.0
+        while True:
+            now = time.monotonic()
+            remaining = (deadline - now) * 1000
+            if self.inflight:
+                if remaining <= 0:
+                    return False
+                # Despierta cuando termina la última; las fallidas se cubren con el tope idle_time
+                event, predicate = "requestfinished", lambda _: not self.inflight
+                wait_ms = min(remaining, idle_time)
+            else:
+                quiet_left = idle_time - (now - self.idle_since) * 1000
+                if quiet_left <= 0:
+                    return True
+                if remaining <= 0:
+                    return False
+                # Cualquier petición relevante interrumpe la ventana de silencio
+                event, predicate = "request", self._tracked
+                wait_ms = min(remaining, quiet_left)
+
+            try:
+                self.page.wait_for_event(event, predicate, timeout=wait_ms)
+            except PlaywrightTimeoutError:
+                pass
+            except PlaywrightError:
+                # Página cerrada mientras esperábamos
+                return not self.inflight
+
+    def detach(self):
+        for event, handler in (("request", self._on_request),
+                               ("requestfinished", self._on_request_done),
+                               ("requestfailed", self._on_request_done)):
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+        _network_trackers.pop(self.page, None)
+
+_network_trackers: Dict[Any, NetworkIdleTracker] = {}
+
+def track_network(page) -> NetworkIdleTracker:
+    """Tracker de red de la página (se instala en la primera llamada y se reutiliza)"""
+    tracker = _network_trackers.get(page)
+    if tracker is None:
+        tracker = _network_trackers[page] = NetworkIdleTracker(page)
+    return tracker
+
+def wait_for_network_idle(page, timeout: int = 5000, idle_time: int = 500) -> bool:
     """
-    Espera a que no haya peticiones de red por idle_time ms
+    Espera a que no haya peticiones de red en vuelo durante idle_time ms.
+    Ignora streams de larga duración (WebSocket, EventSource, media).
     """
-    last_activity = time.time()
-    reqs = set()
-
-    def on_request(request):
-        nonlocal last_activity
-        reqs.add(request)
-        last_activity = time.time()
-
-    def on_request_finished(request):
-        nonlocal last_activity
-        reqs.discard(request)
-        last_activity = time.time()
-
-    page.on("request", on_request)
-    page.on("requestfinished", on_request_finished)
-    page.on("requestfailed", on_request_finished)
-
-    end = time.time() + timeout/1000.0
-    while time.time() < end:
-        if (time.time() - last_activity) * 1000 >= idle_time:
-            break
-        time.sleep(0.05)
-
-    # Detach listeners (Playwright no tiene método off, se detach automáticamente)
-    # page.off("request", on_request)
-    # page.off("requestfinished", on_request_finished)
-    # page.off("requestfailed", on_request_finished)
+    return track_network(page).wait(timeout, idle_time)
 
 def wait_for_webrtc_connection(page, timeout: int = 10000):
     """